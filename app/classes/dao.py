@@ -1,4 +1,4 @@
-from sqlalchemy import select
+from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import joinedload, selectinload
 
@@ -9,7 +9,9 @@ from app.classes.models import (
     ClassUserLesson,
     ClassWord,
 )
+from app.contents.models import Grammar, Topic
 from app.services import CRUDBase
+from app.textbooks.models import Lesson, UserLesson
 
 
 class CRUDClass(CRUDBase):
@@ -17,28 +19,71 @@ class CRUDClass(CRUDBase):
     model = Class
 
     @classmethod
-    async def get_class_simple(cls, session: AsyncSession, class_id: int):
+    async def get_class_detail(cls, session: AsyncSession, class_id: int):
+        """
+        Class with all its relations in at most 7 queries whatever their size:
+        the class, user lessons joined with lesson names, words,
+        grammar topics, their links, other topics and their links
+        """
         query = (
             select(cls.model)
-            .options(joinedload(cls.model.user))
+            .options(
+                selectinload(cls.model.userlessons)
+                .joinedload(UserLesson.lesson)
+                .load_only(Lesson.name)
+            )
             .options(selectinload(cls.model.words))
+            .options(
+                selectinload(cls.model.grammar_topics).selectinload(
+                    Grammar.useful_links
+                )
+            )
+            .options(
+                selectinload(cls.model.other_topics).selectinload(Topic.useful_links)
+            )
             .where(cls.model.id == class_id)
         )
         res = await session.execute(query)
         return res.scalar_one_or_none()
 
     @classmethod
-    async def get_classes(cls, session: AsyncSession, user_id: int):
-        query = (
-            select(cls.model)
-            .options(selectinload(cls.model.userlessons))
-            .options(selectinload(cls.model.words))
-            .options(selectinload(cls.model.grammar_topics))
-            .options(selectinload(cls.model.other_topics))
-            .where(cls.model.user_id == user_id)
+    async def get_class_summaries(
+        cls,
+        session: AsyncSession,
+        user_id: int,
+        cursor: str | None,
+        limit: int,
+    ):
+        """
+        Classes of the user without their relations, only the number of
+        linked rows per relation, in a single query
+        """
+
+        def count_links(link_model):
+            return (
+                select(func.count())
+                .where(link_model.class_id == cls.model.id)
+                .correlate(cls.model)
+                .scalar_subquery()
+            )
+
+        query = select(
+            cls.model.id,
+            cls.model.class_date,
+            cls.model.name,
+            count_links(ClassUserLesson).label("userlessons_count"),
+            count_links(ClassWord).label("words_count"),
+            count_links(ClassGrammar).label("grammar_topics_count"),
+            count_links(ClassTopic).label("other_topics_count"),
+        ).where(cls.model.user_id == user_id)
+        return await cls.paginate(
+            session,
+            query,
+            order_by=("class_date", "id"),
+            cursor=cursor,
+            limit=limit,
+            scalars=False,
         )
-        res = await session.execute(query)
-        return res.scalars().all()
 
 
 class CRUDClassWord(CRUDBase):
@@ -8,6 +8,7 @@ from sqlalchemy import (
     Date,
     Enum,
     ForeignKey,
+    Index,
     String,
     UniqueConstraint,
 )
@@ -65,6 +66,11 @@ class Class(Base):
         return self.name
 
 
+# Serves the (class_date, id) keyset pages of a user, date ranges per user
+# and "newest first" as a backward scan
+Index("ix_class_user_id_class_date_id", Class.user_id, Class.class_date, Class.id)
+
+
 class ClassWord(Base):
     class_id: Mapped[int] = mapped_column(
         ForeignKey("class.id", ondelete="CASCADE"),
@@ -73,6 +79,7 @@ class ClassWord(Base):
     word_id: Mapped[int] = mapped_column(
         ForeignKey("word.id", ondelete="CASCADE"),
         nullable=False,
+        index=True,
     )
     __table_args__ = (UniqueConstraint("class_id", "word_id"),)
 
@@ -88,6 +95,7 @@ class ClassGrammar(Base):
     grammar_id: Mapped[int] = mapped_column(
         ForeignKey("grammar.id", ondelete="CASCADE"),
         nullable=False,
+        index=True,
     )
     __table_args__ = (UniqueConstraint("class_id", "grammar_id"),)
 
@@ -103,6 +111,7 @@ class ClassTopic(Base):
     topic_id: Mapped[int] = mapped_column(
         ForeignKey("topic.id", ondelete="CASCADE"),
         nullable=False,
+        index=True,
     )
     __table_args__ = (UniqueConstraint("class_id", "topic_id"),)
 
@@ -118,6 +127,7 @@ class ClassUserLesson(Base):
     userlesson_id: Mapped[int] = mapped_column(
         ForeignKey("userlesson.id", ondelete="CASCADE"),
         nullable=False,
+        index=True,
     )
     __table_args__ = (UniqueConstraint("class_id", "userlesson_id"),)
 
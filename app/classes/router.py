@@ -19,13 +19,15 @@ from app.classes.models import (
 from app.classes.schemas import (
     ClassBaseSchema,
     ClassCreateSchema,
+    ClassDetailSchema,
     ClassGetSchema,
-    ClassSimpleGetSchema,
+    ClassSummarySchema,
 )
 from app.contents.dao import CRUDGrammar, CRUDTopic, CRUDUsefulLink, CRUDWord
 from app.contents.router import router as contents_router
-from app.database import SessionDep
+from app.database import SessionDep, UnitOfWorkSessionDep
 from app.exceptions import ObjectAlreadyExistsException
+from app.pagination import PageParamsDep, PageSchema
 from app.users.models import User
 from app.users.schemas import UserGetSchema
 from app.users.services import CurrentUserDep
@@ -40,10 +42,13 @@ router = APIRouter(
 async def get_user_classes(
     session: SessionDep,
     user: CurrentUserDep,
-) -> list[ClassGetSchema]:
-    classes = await CRUDClass.get_classes(
+    page: PageParamsDep,
+) -> PageSchema[ClassSummarySchema]:
+    classes = await CRUDClass.get_class_summaries(
         session=session,
         user_id=user.id,
+        cursor=page.cursor,
+        limit=page.limit,
     )
     return classes
 
@@ -52,8 +57,8 @@ async def get_user_classes(
 async def get_class(
     session: SessionDep,
     class_id: int,
-) -> ClassSimpleGetSchema:
-    class_selected = await CRUDClass.get_class_simple(
+) -> ClassDetailSchema:
+    class_selected = await CRUDClass.get_class_detail(
         session=session,
         class_id=class_id,
     )
@@ -62,7 +67,7 @@ async def get_class(
 
 @router.post("/add_class")
 async def add_user_class(
-    session: SessionDep,
+    session: UnitOfWorkSessionDep,
     user: CurrentUserDep,
     class_data: ClassBaseSchema,
 ):
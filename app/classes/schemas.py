@@ -6,8 +6,14 @@ from typing import Optional
 from pydantic import BaseModel, Field, HttpUrl, field_validator, model_validator
 
 from app.classes.models import EntityType
-from app.contents.schemas import GrammarGetSchema, TopicGetSchema, WordGetSchema
-from app.textbooks.schemas import UserLessonGetSchema
+from app.contents.schemas import (
+    GrammarDetailSchema,
+    GrammarGetSchema,
+    TopicDetailSchema,
+    TopicGetSchema,
+    WordGetSchema,
+)
+from app.textbooks.schemas import UserLessonDetailSchema, UserLessonGetSchema
 
 
 class ClassBaseSchema(BaseModel):
@@ -19,9 +25,12 @@ class ClassCreateSchema(BaseModel):
     pass
 
 
-class ClassSimpleGetSchema(ClassBaseSchema):
+class ClassSummarySchema(ClassBaseSchema):
     id: int = Field(gt=0)
-    words: Optional[list[WordGetSchema]] = None
+    userlessons_count: int
+    words_count: int
+    grammar_topics_count: int
+    other_topics_count: int
 
 
 class ClassGetSchema(ClassBaseSchema):
@@ -35,3 +44,10 @@ class ClassGetSchema(ClassBaseSchema):
     words: Optional[list[WordGetSchema]] = None
     grammar_topics: Optional[list[GrammarGetSchema]] = None
     other_topics: Optional[list[TopicGetSchema]] = None
+
+
+class ClassDetailSchema(ClassGetSchema):
+    userlessons: list[UserLessonDetailSchema] = []
+    words: list[WordGetSchema] = []
+    grammar_topics: list[GrammarDetailSchema] = []
+    other_topics: list[TopicDetailSchema] = []
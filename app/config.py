@@ -17,6 +17,14 @@ class Settings(BaseSettings):
     DB_PASS: str
     DB_NAME: str
 
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30  # seconds
+    DB_POOL_RECYCLE: int = 1800  # seconds
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_TIMEOUT: int = 30_000  # milliseconds, 0 disables it
+    DB_PREPARED_STATEMENT_CACHE_SIZE: int = 100
+
     NAME_CONVENTION: dict = {
         "ix": "ix_%(column_0_label)s",
         "uq": "uq_%(table_name)s_%(column_0_N_name)s",
@@ -65,6 +73,31 @@ class Settings(BaseSettings):
     SECRET_KEY: str
     ALGORITHM: str
 
+    AUTH_CACHE_SIZE: int = 10_000
+    # invalidation reaches only the worker that made the change, so a deleted
+    # user stays authenticated on other workers for up to this many seconds
+    AUTH_CACHE_TTL: int = 60  # seconds
+
+    PASSWORD_HASH_WORKERS: int = 4
+
+    PAGE_SIZE_DEFAULT: int = 50
+    PAGE_SIZE_MAX: int = 200
+
+    WORD_SEARCH_LIMIT_MAX: int = 50
+    WORD_LOOKUP_MAX_TERMS: int = 200
+    WORD_IMPORT_BATCH_SIZE: int = 5_000
+    WORD_IMPORT_MAX_ERRORS: int = 1_000
+    WORD_EXPORT_BATCH_SIZE: int = 1_000
+    LAST_CLASSES_MAX: int = 100
+    # words added on other workers reach the autocomplete index of this one
+    # within this period
+    WORD_INDEX_SYNC_SECONDS: float = 30
+
+    QUERY_BUDGET: int = 20  # SQL statements per request before a warning
+    SLOW_QUERY_THRESHOLD_MS: int = 200
+    SLOW_QUERY_BUFFER_SIZE: int = 500
+    SLOW_QUERY_EXPLAIN_RATE: float = 0.1  # share of slow SELECTs to EXPLAIN
+
     # Со 2 версии Pydantic, class Config был заменен на атрибут model_config
     # class Config:
     #     env_file = ".env"
@@ -0,0 +1,181 @@
+import asyncio
+import logging
+from bisect import bisect_left
+from datetime import timedelta
+from heapq import merge
+
+from sqlalchemy import event, func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session, object_session
+
+from app.contents.models import Word
+from app.contents.services import kana_search_key
+
+logger = logging.getLogger(__name__)
+
+# now() is the start of a transaction, a slow transaction may commit words
+# stamped earlier than the newest word already synced
+SYNC_OVERLAP = timedelta(minutes=1)
+
+
+class WordPrefixIndex:
+    """
+    In-process prefix index over kana and kanji of all words: a sorted list
+    of (key, word_id) pairs searched with bisect, so autocomplete never
+    touches the database
+    """
+
+    def __init__(self):
+        self._keys: list[tuple[str, int]] = []
+        self._words: dict[int, dict] = {}
+        self.synced_at = None
+
+    @staticmethod
+    def _index_keys(word: dict) -> set[str]:
+        return {key for key in (kana_search_key(word["kana"]), word["kanji"]) if key}
+
+    @staticmethod
+    def _words_query():
+        return select(Word.id, Word.kana, Word.kanji, Word.translation, Word.updated_at)
+
+    def _track(self, rows) -> list[dict]:
+        """Words without updated_at, which only moves the sync watermark"""
+        words = []
+        for row in rows:
+            word = dict(row)
+            updated_at = word.pop("updated_at")
+            if self.synced_at is None or updated_at > self.synced_at:
+                self.synced_at = updated_at
+            words.append(word)
+        return words
+
+    async def load(self, session: AsyncSession):
+        query = self._words_query().execution_options(yield_per=10_000)
+        result = await session.stream(query)
+        self.synced_at = None
+        words = {}
+        keys = []
+        async for rows in result.mappings().partitions():
+            for word in self._track(rows):
+                words[word["id"]] = word
+                keys.extend((key, word["id"]) for key in self._index_keys(word))
+        keys.sort()
+        self._words = words
+        self._keys = keys
+
+    async def sync(self, session: AsyncSession):
+        """
+        Picks up words written by other workers, whose commits never reach
+        the hooks of this process. Deleted or missed words show up as
+        a different count and trigger a full reload
+        """
+        if self.synced_at is not None:
+            query = self._words_query().where(
+                Word.updated_at >= self.synced_at - SYNC_OVERLAP
+            )
+            result = await session.execute(query)
+            changed = [
+                word
+                for word in self._track(result.mappings())
+                if self._words.get(word["id"]) != word
+            ]
+            if changed:
+                self.apply(changed)
+        count = await session.scalar(select(func.count(Word.id)))
+        if count != len(self._words):
+            await self.load(session)
+
+    async def poll(self, session_factory: async_sessionmaker, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                async with session_factory() as session:
+                    await self.sync(session)
+            except Exception:
+                logger.exception("Autocomplete index sync failed")
+
+    async def refresh(self, session: AsyncSession, word_ids: list[int]):
+        """
+        Re-reads words written by bulk statements, which bypass the ORM events.
+        Inside an open transaction they are applied once it commits
+        """
+        if not word_ids:
+            return
+        in_transaction = session.in_transaction()
+        query = select(Word.id, Word.kana, Word.kanji, Word.translation).where(
+            Word.id.in_(word_ids)
+        )
+        result = await session.execute(query)
+        words = [dict(row) for row in result.mappings()]
+        if in_transaction:
+            session.info.setdefault("indexed_words", []).extend(words)
+            return
+        self.apply(words)
+
+    def apply(self, words: list[dict], removed_ids: list[int] = ()):
+        """
+        Adds or replaces words and removes removed_ids in one pass over
+        the keys, new keys are sorted on their own and merged in
+        """
+        removed = set(removed_ids)
+        words = [word for word in words if word["id"] not in removed]
+        stale = {word["id"] for word in words} | removed
+        stale &= self._words.keys()
+        keys = self._keys
+        if stale:
+            keys = [pair for pair in keys if pair[1] not in stale]
+            for word_id in stale:
+                del self._words[word_id]
+        new_keys = []
+        for word in words:
+            self._words[word["id"]] = word
+            new_keys.extend((key, word["id"]) for key in self._index_keys(word))
+        new_keys.sort()
+        self._keys = list(merge(keys, new_keys)) if new_keys else keys
+
+    def search(self, prefix: str, limit: int) -> list[dict]:
+        prefix = kana_search_key(prefix)
+        found = {}
+        i = bisect_left(self._keys, (prefix,))
+        while i < len(self._keys) and len(found) < limit:
+            key, word_id = self._keys[i]
+            if not key.startswith(prefix):
+                break
+            found.setdefault(word_id, self._words[word_id])
+            i += 1
+        return list(found.values())
+
+
+word_index = WordPrefixIndex()
+
+
+# Words are applied to the index only once their transaction commits
+@event.listens_for(Word, "after_insert")
+@event.listens_for(Word, "after_update")
+def _queue_word_indexing(mapper, connection, target):
+    word = {
+        "id": target.id,
+        "kana": target.kana,
+        "kanji": target.kanji,
+        "translation": target.translation,
+    }
+    object_session(target).info.setdefault("indexed_words", []).append(word)
+
+
+@event.listens_for(Word, "after_delete")
+def _queue_word_removal(mapper, connection, target):
+    object_session(target).info.setdefault("unindexed_words", []).append(target.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_word_indexing(session):
+    words = session.info.pop("indexed_words", [])
+    removed_ids = session.info.pop("unindexed_words", [])
+    if words or removed_ids:
+        word_index.apply(words, removed_ids)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_word_indexing(session):
+    session.info.pop("indexed_words", None)
+    session.info.pop("unindexed_words", None)
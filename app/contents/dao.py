@@ -1,15 +1,51 @@
-from sqlalchemy import select
+from datetime import date
+
+from sqlalchemy import (
+    Select,
+    String,
+    Subquery,
+    any_,
+    bindparam,
+    func,
+    or_,
+    select,
+    true,
+)
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
+from app.classes.models import Class, ClassWord
+from app.contents.autocomplete import word_index
 from app.contents.models import Grammar, Topic, UsefulLink, Word
 from app.contents.schemas import WordCreateKanaTranslSchema, WordGetSchema
+from app.contents.services import kana_search_key
 from app.services import CRUDBase
 
 
 class CRUDWord(CRUDBase):
 
     model = Word
+    conflict_columns = ("kana", "translation")
+
+    @classmethod
+    def prepare_row(
+        cls,
+        data: dict,
+    ) -> dict:
+        data["search_key"] = kana_search_key(data["kana"])
+        return data
+
+    @classmethod
+    async def upsert_bulk(
+        cls,
+        session: AsyncSession,
+        data: list[dict],
+        index_elements: list[str] | None = None,
+    ):
+        result = await super().upsert_bulk(session, data, index_elements)
+        await word_index.refresh(session, result["inserted"])
+        return result
 
     @classmethod
     async def search_word(
@@ -18,13 +54,202 @@ class CRUDWord(CRUDBase):
         kana: str,
         translation: str,
     ):
+        """
+        Katakana and hiragana spellings share a search key but are unique
+        only as written, so the oldest matching word wins
+        """
         query = (
             select(cls.model)
-            .where(cls.model.kana == kana)
+            .where(cls.model.search_key == kana_search_key(kana))
             .filter(cls.model.translation.contains(translation.lower()))
+            .order_by(cls.model.id)
+            .limit(1)
+        )
+        result = await session.execute(query)
+        return result.scalars().first()
+
+    @classmethod
+    async def get_word(
+        cls,
+        session: AsyncSession,
+        kana: str,
+        translation: str,
+    ):
+        query = (
+            select(cls.model)
+            .filter_by(search_key=kana_search_key(kana), translation=translation)
+            .order_by(cls.model.id)
+            .limit(1)
+        )
+        result = await session.execute(query)
+        return result.scalars().first()
+
+    @classmethod
+    def user_words_query(
+        cls,
+        user_id: int,
+    ) -> Select:
+        """
+        Words of all classes of the user. A semi-join instead of distinct,
+        so rows come out in primary key order without a sort and can be streamed
+        """
+        in_user_classes = (
+            select(ClassWord.id)
+            .join(Class, Class.id == ClassWord.class_id)
+            .where(Class.user_id == user_id)
+            .where(ClassWord.word_id == cls.model.id)
+            .exists()
+        )
+        return (
+            select(
+                cls.model.id,
+                cls.model.kana,
+                cls.model.kanji,
+                cls.model.translation,
+                cls.model.example_sentences,
+            )
+            .where(in_user_classes)
+            .order_by(cls.model.id)
+        )
+
+    @classmethod
+    async def get_first_seen_words(
+        cls,
+        session: AsyncSession,
+        classes: Subquery,
+    ):
+        """
+        Distinct words of the given classes with the date of the class
+        they first appeared in. The words of each class are fetched by
+        a LATERAL subquery over the classword (class_id, word_id) index,
+        so only the selected classes are ever touched
+        """
+        class_words = (
+            select(ClassWord.word_id)
+            .where(ClassWord.class_id == classes.c.id)
+            .lateral("class_words")
+        )
+        first_class_date = func.min(classes.c.class_date).label("first_class_date")
+        query = (
+            select(
+                cls.model.id,
+                cls.model.kanji,
+                cls.model.kana,
+                cls.model.translation,
+                cls.model.example_sentences,
+                cls.model.lesson_id,
+                first_class_date,
+            )
+            .select_from(classes)
+            .join(class_words, true())
+            .join(cls.model, cls.model.id == class_words.c.word_id)
+            .group_by(cls.model.id)
+            .order_by(first_class_date, cls.model.id)
+        )
+        result = await session.execute(query)
+        return result.mappings().all()
+
+    @classmethod
+    async def get_words_between(
+        cls,
+        session: AsyncSession,
+        user_id: int,
+        date_from: date,
+        date_to: date,
+    ):
+        classes = (
+            select(Class.id, Class.class_date)
+            .where(Class.user_id == user_id)
+            .where(Class.class_date.between(date_from, date_to))
+            .subquery()
+        )
+        return await cls.get_first_seen_words(session, classes)
+
+    @classmethod
+    async def get_words_of_last_classes(
+        cls,
+        session: AsyncSession,
+        user_id: int,
+        count: int,
+    ):
+        """
+        Top N classes read backwards from the (user_id, class_date, id) index
+        """
+        classes = (
+            select(Class.id, Class.class_date)
+            .where(Class.user_id == user_id)
+            .order_by(Class.class_date.desc(), Class.id.desc())
+            .limit(count)
+            .subquery()
+        )
+        return await cls.get_first_seen_words(session, classes)
+
+    @classmethod
+    async def lookup_words(
+        cls,
+        session: AsyncSession,
+        terms: list[tuple[str, str | None]],
+    ) -> list[dict]:
+        """
+        Resolves every (term, translation) pair in one query. A term matches
+        words by kana search key or by kanji, translation is matched as in
+        search_word. Results follow the order of terms
+        """
+        keys = {kana_search_key(term) for term, _ in terms}
+        spellings = {term.strip() for term, _ in terms}
+        query = select(cls.model).where(
+            or_(
+                cls.model.search_key
+                == any_(bindparam("keys", list(keys), type_=ARRAY(String))),
+                cls.model.kanji
+                == any_(bindparam("spellings", list(spellings), type_=ARRAY(String))),
+            )
         )
         result = await session.execute(query)
-        return result.scalar_one_or_none()
+        words_by_key, words_by_kanji = {}, {}
+        for word in result.scalars().all():
+            words_by_key.setdefault(word.search_key, []).append(word)
+            if word.kanji:
+                words_by_kanji.setdefault(word.kanji, []).append(word)
+
+        found = []
+        for term, translation in terms:
+            words = words_by_key.get(kana_search_key(term), [])
+            words = words + words_by_kanji.get(term.strip(), [])
+            if translation:
+                words = [
+                    word
+                    for word in words
+                    if word.translation and translation.lower() in word.translation
+                ]
+            found.append({"term": term, "translation": translation, "words": words})
+        return found
+
+    @classmethod
+    async def search_words(
+        cls,
+        session: AsyncSession,
+        query: str,
+        limit: int,
+    ):
+        """
+        Top matches by translation, ranked by trigram similarity
+        (served by the pg_trgm GIN index on word.translation)
+        """
+        translation = cls.model.translation
+        stmt = (
+            select(cls.model)
+            .where(
+                or_(
+                    translation.op("%")(query),
+                    translation.icontains(query, autoescape=True),
+                )
+            )
+            .order_by(func.similarity(translation, query).desc(), cls.model.id)
+            .limit(limit)
+        )
+        result = await session.execute(stmt)
+        return result.scalars().all()
 
     @classmethod
     async def add_word(
@@ -46,13 +271,16 @@ class CRUDWord(CRUDBase):
 class CRUDGrammar(CRUDBase):
 
     model = Grammar
+    conflict_columns = ("name_russian",)
 
 
 class CRUDTopic(CRUDBase):
 
     model = Topic
+    conflict_columns = ("name_russian",)
 
 
 class CRUDUsefulLink(CRUDBase):
 
     model = UsefulLink
+    conflict_columns = ("url",)
@@ -0,0 +1,50 @@
+import csv
+import io
+import json
+from typing import AsyncIterator
+
+from app.config import settings
+from app.contents.dao import CRUDWord
+from app.database import new_session
+
+EXPORT_COLUMNS = ("id", "kana", "kanji", "translation", "example_sentences")
+
+MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+
+def encode_csv(rows: list[dict], header: bool = False) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS)
+    if header:
+        writer.writeheader()
+    writer.writerows(rows)
+    return buffer.getvalue().encode()
+
+
+def encode_ndjson(rows: list[dict]) -> bytes:
+    return "".join(json.dumps(row, ensure_ascii=False) + "\n" for row in rows).encode()
+
+
+async def export_user_words(user_id: int, file_format: str) -> AsyncIterator[bytes]:
+    """
+    Vocabulary of the user read with a server-side cursor and encoded
+    batch by batch, so memory stays constant whatever the number of words.
+    The session is opened here because the request session is closed
+    before a streaming response starts sending.
+    """
+    if file_format == "csv":
+        yield encode_csv([], header=True)
+    async with new_session() as session:
+        query = CRUDWord.user_words_query(user_id).execution_options(
+            yield_per=settings.WORD_EXPORT_BATCH_SIZE
+        )
+        result = await session.stream(query)
+        async for rows in result.mappings().partitions():
+            rows = [dict(row) for row in rows]
+            if file_format == "csv":
+                yield encode_csv(rows)
+            else:
+                yield encode_ndjson(rows)
@@ -0,0 +1,219 @@
+import argparse
+import asyncio
+import codecs
+import csv
+import json
+from typing import AsyncIterator, Awaitable, Callable
+
+from pydantic import ValidationError
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.contents.autocomplete import word_index
+from app.contents.schemas import WordCreateSchema
+from app.contents.services import kana_search_key
+from app.database import new_session
+from app.exceptions import ObjectNotFoundException
+from app.textbooks.dao import CRUDLesson
+
+IMPORT_COLUMNS = ("kana", "kanji", "translation", "example_sentences")
+STAGING_COLUMNS = IMPORT_COLUMNS + ("lesson_id", "search_key")
+
+DELIMITERS = {
+    "csv": ",",
+    "tsv": "\t",
+    "anki": "\t",
+}
+ANKI_SEPARATORS = {
+    "tab": "\t",
+    "comma": ",",
+    "semicolon": ";",
+    "pipe": "|",
+    "space": " ",
+}
+
+
+async def iter_lines(
+    read: Callable[[int], Awaitable[bytes]],
+    chunk_size: int = 64 * 1024,
+) -> AsyncIterator[str]:
+    """
+    Lines of an utf-8 upload, decoded chunk by chunk
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    buffer = ""
+    while chunk := await read(chunk_size):
+        buffer += decoder.decode(chunk)
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+    buffer += decoder.decode(b"", final=True)
+    if buffer:
+        yield buffer.rstrip("\r")
+
+
+async def import_words(
+    session: AsyncSession,
+    read: Callable[[int], Awaitable[bytes]],
+    delimiter: str = "\t",
+    lesson_id: int | None = None,
+) -> dict:
+    """
+    Streams words from a CSV/TSV (or Anki text export) into a staging
+    table with COPY and merges them into word, skipping duplicates.
+    Only one batch of rows and a capped list of errors is held in memory.
+    A header row naming the columns is optional, by default the columns are
+    kana, kanji, translation, example_sentences.
+    """
+    if lesson_id is not None and not await CRUDLesson.get_by_id(session, lesson_id):
+        raise ObjectNotFoundException(detail="Урок не найден")
+    report = {
+        "rows": 0,
+        "valid": 0,
+        "inserted": 0,
+        "duplicates": 0,
+        "errors_total": 0,
+        "errors": [],
+    }
+    await session.execute(
+        text(
+            """
+            create temp table word_import (
+                kana varchar not null,
+                kanji varchar,
+                translation varchar,
+                example_sentences varchar,
+                lesson_id integer,
+                search_key varchar not null
+            ) on commit drop
+            """
+        )
+    )
+    connection = await session.connection()
+    raw_connection = await connection.get_raw_connection()
+    driver_connection = raw_connection.driver_connection
+
+    columns = IMPORT_COLUMNS
+    header_checked = False
+    batch = []
+    line_number = 0
+    async for line in iter_lines(read):
+        line_number += 1
+        if line.startswith("#"):
+            key, _, value = line[1:].partition(":")
+            if key == "separator":
+                delimiter = ANKI_SEPARATORS.get(value.strip(), delimiter)
+            continue
+        if not line.strip():
+            continue
+        values = next(csv.reader([line], delimiter=delimiter))
+        if not header_checked:
+            header_checked = True
+            header = tuple(value.strip().lower() for value in values)
+            if "kana" in header:
+                columns = header
+                continue
+
+        report["rows"] += 1
+        try:
+            word = WordCreateSchema(
+                **{
+                    column: value.strip() or None
+                    for column, value in zip(columns, values)
+                    if column in IMPORT_COLUMNS
+                },
+                lesson_id=lesson_id,
+            )
+        except ValidationError as e:
+            report["errors_total"] += 1
+            if len(report["errors"]) < settings.WORD_IMPORT_MAX_ERRORS:
+                report["errors"].append(
+                    {
+                        "line": line_number,
+                        "errors": [error["msg"] for error in e.errors()],
+                    }
+                )
+            continue
+
+        report["valid"] += 1
+        batch.append(
+            (
+                word.kana,
+                word.kanji,
+                word.translation,
+                word.example_sentences,
+                word.lesson_id,
+                kana_search_key(word.kana),
+            )
+        )
+        if len(batch) >= settings.WORD_IMPORT_BATCH_SIZE:
+            await driver_connection.copy_records_to_table(
+                "word_import", records=batch, columns=STAGING_COLUMNS
+            )
+            batch = []
+    if batch:
+        await driver_connection.copy_records_to_table(
+            "word_import", records=batch, columns=STAGING_COLUMNS
+        )
+
+    result = await session.execute(
+        text(
+            """
+            insert into word (
+                kana, kanji, translation, example_sentences, lesson_id, search_key
+            )
+            select distinct on (s.kana, s.translation)
+                s.kana,
+                s.kanji,
+                s.translation,
+                s.example_sentences,
+                s.lesson_id,
+                s.search_key
+            from word_import s
+            -- the unique constraint treats null translations as distinct,
+            -- distinct on and this check treat them as equal
+            where not exists (
+                select 1
+                from word w
+                where w.kana = s.kana
+                    and w.translation is not distinct from s.translation
+            )
+            order by s.kana, s.translation
+            on conflict (kana, translation) do nothing
+            returning id
+            """
+        )
+    )
+    inserted = result.scalars().all()
+    await session.commit()
+    await word_index.refresh(session, inserted)
+
+    report["inserted"] = len(inserted)
+    report["duplicates"] = report["valid"] - len(inserted)
+    return report
+
+
+async def main(path: str, file_format: str, lesson_id: int | None):
+    with open(path, "rb") as file:
+
+        async def read(size: int) -> bytes:
+            return file.read(size)
+
+        async with new_session() as session:
+            report = await import_words(
+                session,
+                read,
+                delimiter=DELIMITERS[file_format],
+                lesson_id=lesson_id,
+            )
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import words from a file")
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=DELIMITERS, default="tsv")
+    parser.add_argument("--lesson-id", type=int, default=None)
+    args = parser.parse_args()
+    asyncio.run(main(args.path, args.format, args.lesson_id))
@@ -8,11 +8,13 @@ from sqlalchemy import (
     Date,
     Enum,
     ForeignKey,
+    Index,
     String,
     UniqueConstraint,
 )
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.orm import Mapped, mapped_column, relationship, validates
 
+from app.contents.services import kana_search_key
 from app.database import Base
 
 if TYPE_CHECKING:
@@ -35,10 +37,12 @@ class UsefulLink(Base):
     grammar_id: Mapped[Optional[int]] = mapped_column(
         ForeignKey("grammar.id", ondelete="CASCADE"),
         nullable=True,
+        index=True,
     )
     topic_id: Mapped[Optional[int]] = mapped_column(
         ForeignKey("topic.id", ondelete="CASCADE"),
         nullable=True,
+        index=True,
     )
     __table_args__ = (
         CheckConstraint(
@@ -62,22 +66,40 @@ class UsefulLink(Base):
 
 
 class Word(Base):
-    kanji: Mapped[Optional[str]] = mapped_column(nullable=True)
+    kanji: Mapped[Optional[str]] = mapped_column(nullable=True, index=True)
     kana: Mapped[str] = mapped_column(nullable=False)
+    search_key: Mapped[str] = mapped_column(nullable=False, index=True)
     translation: Mapped[Optional[str]] = mapped_column(nullable=True)
     example_sentences: Mapped[Optional[str]] = mapped_column(nullable=True)
     lesson_id: Mapped[int] = mapped_column(
         ForeignKey("lesson.id", ondelete="CASCADE"),
         nullable=True,
+        index=True,
     )
 
-    __table_args__ = (UniqueConstraint("kana", "translation"),)
+    # kana lookups are served by the unique index, whose leading column is kana
+    __table_args__ = (
+        UniqueConstraint("kana", "translation"),
+        Index(
+            "ix_word_translation_trgm",
+            "translation",
+            postgresql_using="gin",
+            postgresql_ops={"translation": "gin_trgm_ops"},
+        ),
+        # changes since the last autocomplete index sync
+        Index("ix_word_updated_at", "updated_at"),
+    )
 
     classes: Mapped[Optional[list["Class"]]] = relationship(
         secondary="classword",
         back_populates="words",
     )
 
+    @validates("kana")
+    def set_search_key(self, key, value):
+        self.search_key = kana_search_key(value)
+        return value
+
     def __repr__(self):
         if self.kana and not self.kanji:
             return self.kana
@@ -88,7 +110,10 @@ class Word(Base):
 class Grammar(Base):
     name_russian: Mapped[str] = mapped_column(index=True, unique=True)
     name_japanese: Mapped[Optional[str]] = mapped_column(nullable=True)
-    lesson_id: Mapped[int] = mapped_column(ForeignKey("lesson.id", ondelete="CASCADE"))
+    lesson_id: Mapped[int] = mapped_column(
+        ForeignKey("lesson.id", ondelete="CASCADE"),
+        index=True,
+    )
 
     useful_links: Mapped[Optional[list[UsefulLink]]] = relationship(
         "UsefulLink",
@@ -106,7 +131,10 @@ class Grammar(Base):
 class Topic(Base):
     name_russian: Mapped[str] = mapped_column(index=True, unique=True)
     name_japanese: Mapped[Optional[str]] = mapped_column(nullable=True)
-    lesson_id: Mapped[int] = mapped_column(ForeignKey("lesson.id", ondelete="CASCADE"))
+    lesson_id: Mapped[int] = mapped_column(
+        ForeignKey("lesson.id", ondelete="CASCADE"),
+        index=True,
+    )
 
     useful_links: Mapped[Optional[list[UsefulLink]]] = relationship(
         "UsefulLink",
@@ -1,6 +1,8 @@
-from datetime import datetime
+from datetime import date, datetime
+from typing import Literal
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Query, UploadFile
+from fastapi.responses import StreamingResponse
 
 from app.classes.dao import (
     CRUDClass,
@@ -9,7 +11,11 @@ from app.classes.dao import (
     CRUDClassUserLesson,
     CRUDClassWord,
 )
+from app.config import settings
+from app.contents.autocomplete import word_index
 from app.contents.dao import CRUDGrammar, CRUDTopic, CRUDUsefulLink, CRUDWord
+from app.contents.exporter import MEDIA_TYPES, export_user_words
+from app.contents.importer import DELIMITERS, import_words
 from app.contents.models import Grammar, Topic, UsefulLink, Word
 from app.contents.schemas import (
     GrammarCreateSchema,
@@ -18,15 +24,20 @@ from app.contents.schemas import (
     TopicGetSchema,
     UsefulLinkCreateSchema,
     UsefulLinkGetSchema,
+    WordAutocompleteSchema,
+    WordBatchLookupSchema,
     WordCreateKanaTranslSchema,
     WordCreateSchema,
+    WordFirstSeenSchema,
     WordGetSchema,
+    WordLookupResultSchema,
 )
+from app.contents.services import split_sentence
 from app.database import SessionDep
 from app.exceptions import ObjectAlreadyExistsException
 from app.users.models import User
 from app.users.schemas import UserGetSchema
-from app.users.services import CurrentUserDep
+from app.users.services import AdminUserDep, CurrentUserDep
 
 router = APIRouter(
     prefix="/contents",
@@ -35,10 +46,7 @@ router = APIRouter(
 
 # TODO: add a word to the class: check at words, add to class words, if present in words update there
 # TODO: get words for for the class
-# TODO: get all words of user
 # TODO: get all words of a lesson
-# TODO: get words for the user in the last 3 classes
-# TODO: get words for the user in between two dates
 
 
 # @router.post("/add_word")
@@ -67,13 +75,106 @@ async def popup_word(
     return word
 
 
+@router.post("/import_words")
+async def import_words_from_file(
+    session: SessionDep,
+    admin: AdminUserDep,
+    file: UploadFile,
+    file_format: Literal["csv", "tsv", "anki"] = "tsv",
+    lesson_id: int | None = None,
+):
+    report = await import_words(
+        session=session,
+        read=file.read,
+        delimiter=DELIMITERS[file_format],
+        lesson_id=lesson_id,
+    )
+    return report
+
+
+@router.get("/words/between")
+async def get_words_between(
+    session: SessionDep,
+    user: CurrentUserDep,
+    date_from: date,
+    date_to: date,
+) -> list[WordFirstSeenSchema]:
+    return await CRUDWord.get_words_between(
+        session=session,
+        user_id=user.id,
+        date_from=date_from,
+        date_to=date_to,
+    )
+
+
+@router.get("/words/last_classes")
+async def get_words_of_last_classes(
+    session: SessionDep,
+    user: CurrentUserDep,
+    count: int = Query(3, ge=1, le=settings.LAST_CLASSES_MAX),
+) -> list[WordFirstSeenSchema]:
+    return await CRUDWord.get_words_of_last_classes(
+        session=session,
+        user_id=user.id,
+        count=count,
+    )
+
+
+@router.get("/export_words")
+async def export_words(
+    user: CurrentUserDep,
+    file_format: Literal["csv", "ndjson"] = "csv",
+) -> StreamingResponse:
+    return StreamingResponse(
+        export_user_words(user.id, file_format),
+        media_type=MEDIA_TYPES[file_format],
+        headers={"Content-Disposition": f'attachment; filename="words.{file_format}"'},
+    )
+
+
+@router.post("/lookup_words")
+async def lookup_words(
+    session: SessionDep,
+    lookup_data: WordBatchLookupSchema,
+) -> list[WordLookupResultSchema]:
+    terms = [(word.kana, word.translation) for word in lookup_data.words]
+    if lookup_data.sentence:
+        terms += [(term, None) for term in split_sentence(lookup_data.sentence)]
+    return await CRUDWord.lookup_words(
+        session=session,
+        terms=terms[: settings.WORD_LOOKUP_MAX_TERMS],
+    )
+
+
+@router.get("/search_words")
+async def search_words(
+    session: SessionDep,
+    query: str = Query(min_length=1),
+    limit: int = Query(10, ge=1, le=settings.WORD_SEARCH_LIMIT_MAX),
+) -> list[WordGetSchema]:
+    words = await CRUDWord.search_words(
+        session=session,
+        query=query,
+        limit=limit,
+    )
+    return words
+
+
+@router.get("/autocomplete")
+async def autocomplete(
+    prefix: str = Query(min_length=1),
+    limit: int = Query(10, ge=1, le=settings.WORD_SEARCH_LIMIT_MAX),
+) -> list[WordAutocompleteSchema]:
+    return word_index.search(prefix, limit)
+
+
 @router.get("/get_word")
 async def get_word(
     session: SessionDep,
     kana: str,
     translation: str,
 ) -> WordGetSchema:
-    word = await CRUDWord.get_one_or_none(
+    word = await CRUDWord.get_word(
         session=session,
         kana=kana,
         translation=translation,
@@ -5,7 +5,8 @@ from typing import Optional
 
 from pydantic import BaseModel, Field, HttpUrl, field_validator, model_validator
 
-from app.classes.models import EntityType
+from app.config import settings
+from app.contents.models import EntityType
 from app.textbooks.schemas import UserLessonGetSchema
 
 
@@ -21,6 +22,20 @@ class WordCreateKanaTranslSchema(BaseModel):
         return value
 
 
+class WordBatchLookupSchema(BaseModel):
+    words: list[WordCreateKanaTranslSchema] = Field(
+        default_factory=list,
+        max_length=settings.WORD_LOOKUP_MAX_TERMS,
+    )
+    sentence: Optional[str] = Field(None, example="これ は 例文 です。")
+
+    @model_validator(mode="after")
+    def check_terms(self):
+        if not self.words and not self.sentence:
+            raise ValueError("words or sentence must be set")
+        return self
+
+
 class WordBaseSchema(BaseModel):
     kanji: Optional[str] = Field(None, example="漢字")
     kana: str = Field(example="ひらがな or カタカナ")
@@ -52,6 +67,23 @@ class WordGetSchema(WordCreateSchema):
     id: int = Field(gt=0)
 
 
+class WordFirstSeenSchema(WordGetSchema):
+    first_class_date: date
+
+
+class WordLookupResultSchema(BaseModel):
+    term: str
+    translation: Optional[str] = None
+    words: list[WordGetSchema]
+
+
+class WordAutocompleteSchema(BaseModel):
+    id: int
+    kana: str
+    kanji: Optional[str] = None
+    translation: Optional[str] = None
+
+
 class UsefulLinkCreateSchema(BaseModel):
     url: HttpUrl
     description: str
@@ -88,6 +120,10 @@ class GrammarGetSchema(GrammarCreateSchema):
     id: int = Field(gt=0)
 
 
+class GrammarDetailSchema(GrammarGetSchema):
+    useful_links: list[UsefulLinkGetSchema] = []
+
+
 class TopicCreateSchema(BaseModel):
     name_russian: str = Field(..., example="Грамматика")
     name_japanese: Optional[str] = Field(None, example="文法")
@@ -96,3 +132,7 @@ class TopicCreateSchema(BaseModel):
 
 class TopicGetSchema(TopicCreateSchema):
     id: int = Field(gt=0)
+
+
+class TopicDetailSchema(TopicGetSchema):
+    useful_links: list[UsefulLinkGetSchema] = []
@@ -0,0 +1,27 @@
+import re
+
+# Katakana is folded to hiragana and whitespace is dropped, so that
+# カタカナ, かたかな and "かた かな" share one lookup key
+KANA_SEARCH_KEY_TABLE = str.maketrans(
+    {
+        **{chr(code): chr(code - 0x60) for code in range(0x30A1, 0x30F7)},
+        "ヽ": "ゝ",
+        "ヾ": "ゞ",
+        **{space: None for space in " \t\r\n　"},
+    }
+)
+
+
+def kana_search_key(kana: str) -> str:
+    return kana.translate(KANA_SEARCH_KEY_TABLE)
+
+
+SENTENCE_SEPARATORS = re.compile(r"[\s、。，,.！!？?・「」『』（）()]+")
+
+
+def split_sentence(sentence: str) -> list[str]:
+    """
+    Terms of a sentence written with spaces or punctuation between words,
+    as in the example sentences shown to students
+    """
+    return [term for term in SENTENCE_SEPARATORS.split(sentence) if term]
@@ -1,17 +1,83 @@
+import time
 from typing import Annotated
 
 from fastapi import Depends
-from sqlalchemy import TIMESTAMP, Integer, MetaData, func
+from sqlalchemy import (
+    TIMESTAMP,
+    Integer,
+    MetaData,
+    PrimaryKeyConstraint,
+    UniqueConstraint,
+    func,
+    inspect,
+)
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase, Mapped, declared_attr, mapped_column
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from app.config import settings
 
+
+class PoolStats:
+    """Counters of how long requests wait to check out a connection"""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def record_wait(self, seconds: float):
+        self.checkouts += 1
+        self.wait_total += seconds
+        self.wait_max = max(self.wait_max, seconds)
+
+
+pool_stats = PoolStats()
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            pool_stats.record_wait(time.perf_counter() - start)
+
+
 engine = create_async_engine(
     url=settings.DATABASE_URL,
-    echo=True,
+    echo=settings.MODE == "DEV",
+    poolclass=InstrumentedQueuePool,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+    connect_args={
+        "prepared_statement_cache_size": settings.DB_PREPARED_STATEMENT_CACHE_SIZE,
+        "server_settings": {
+            "statement_timeout": str(settings.DB_STATEMENT_TIMEOUT),
+        },
+    },
 )
 
+
+def get_pool_stats() -> dict:
+    pool = engine.pool
+    capacity = pool.size() + settings.DB_MAX_OVERFLOW
+    return {
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": max(pool.overflow(), 0),
+        "saturation": pool.checkedout() / capacity if capacity else 0.0,
+        "checkouts": pool_stats.checkouts,
+        "wait_seconds_total": pool_stats.wait_total,
+        "wait_seconds_max": pool_stats.wait_max,
+    }
+
+
 """The newer easier way to create async session generator"""
 new_session = async_sessionmaker(engine, expire_on_commit=False)
 
@@ -25,6 +91,24 @@ async def get_session() -> AsyncSession:
 SessionDep = Annotated[AsyncSession, Depends(get_session)]
 
 
+async def get_unit_of_work_session() -> AsyncSession:
+    """
+    Session for write endpoints: DAO calls only flush, the whole request is
+    committed once at the end and rolled back if anything raises
+    """
+    async with new_session() as session:
+        session.info["unit_of_work"] = True
+        try:
+            yield session
+            await session.commit()
+        except Exception:
+            await session.rollback()
+            raise
+
+
+UnitOfWorkSessionDep = Annotated[AsyncSession, Depends(get_unit_of_work_session)]
+
+
 class Base(DeclarativeBase):
 
     metadata = MetaData(
@@ -35,7 +119,7 @@ class Base(DeclarativeBase):
     def __tablename__(cls) -> str:
         return cls.__name__.lower()
 
-    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
     created_at: Mapped[TIMESTAMP] = mapped_column(
         TIMESTAMP,
         server_default=func.now(),
@@ -45,3 +129,34 @@ class Base(DeclarativeBase):
         server_default=func.now(),
         onupdate=func.now(),
     )
+
+    def loaded_or_id(self, relationship: str):
+        """
+        Related object if it is already loaded, its id otherwise,
+        so that __repr__ never triggers a lazy load
+        """
+        if relationship in inspect(self).unloaded:
+            return getattr(self, f"{relationship}_id")
+        return getattr(self, relationship)
+
+
+def find_unindexed_foreign_keys(metadata: MetaData) -> list[str]:
+    """
+    Foreign keys whose columns are not the leading columns of any index,
+    unique constraint or primary key, so joins and cascades on them
+    scan the whole table
+    """
+    unindexed = []
+    for table in metadata.sorted_tables:
+        indexed = [list(index.columns) for index in table.indexes]
+        indexed += [
+            list(constraint.columns)
+            for constraint in table.constraints
+            if isinstance(constraint, (UniqueConstraint, PrimaryKeyConstraint))
+        ]
+        for foreign_key in table.foreign_key_constraints:
+            columns = list(foreign_key.columns)
+            if not any(index[: len(columns)] == columns for index in indexed):
+                names = ", ".join(column.name for column in columns)
+                unindexed.append(f"{table.name}({names})")
+    return unindexed
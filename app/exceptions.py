@@ -29,26 +29,54 @@ class ObjectAlreadyExistsException(UserException):
     status_code = status.HTTP_409_CONFLICT
 
 
+class MultipleObjectsFoundException(UserException):
+    status_code = status.HTTP_409_CONFLICT
+    detail = "Условию соответствует больше одного объекта"
+
+
 class IncorrectEmailOrPasswordException(UserException):
     status_code = status.HTTP_401_UNAUTHORIZED
     detail = "Неверная почта или пароль"
 
 
 class UnauthorizedException(UserException):
-    status_code = (status.HTTP_401_UNAUTHORIZED,)
+    status_code = status.HTTP_401_UNAUTHORIZED
     detail = "Пользователь не авторизован"
 
 
 class UserNotFoundException(UserException):
-    status_code = (status.HTTP_401_UNAUTHORIZED,)
+    status_code = status.HTTP_401_UNAUTHORIZED
     detail = "Пользователь не найден"
 
 
 class TokenExpiredException(UserException):
-    status_code = (status.HTTP_401_UNAUTHORIZED,)
+    status_code = status.HTTP_401_UNAUTHORIZED
     detail = "Срок действия токена истек"
 
 
 class IncorrectTokenFormatException(UserException):
-    status_code = (status.HTTP_401_UNAUTHORIZED,)
+    status_code = status.HTTP_401_UNAUTHORIZED
     detail = "Неверный формат токена"
+
+
+class ForbiddenException(UserException):
+    status_code = status.HTTP_403_FORBIDDEN
+    detail = "Недостаточно прав"
+
+
+class IncorrectCursorException(UserException):
+    status_code = status.HTTP_400_BAD_REQUEST
+    detail = "Неверный курсор пагинации"
+
+
+class ObjectNotFoundException(UserException):
+    status_code = status.HTTP_404_NOT_FOUND
+    detail = "Объект не найден"
+
+
+class UnknownUsersException(UserException):
+    def __init__(self, user_ids: list[int]):
+        self.detail = f"Пользователи не найдены: {', '.join(map(str, user_ids))}"
+        super().__init__(status_code=self.status_code, detail=self.detail)
+
+    status_code = status.HTTP_422_UNPROCESSABLE_ENTITY
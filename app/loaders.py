@@ -0,0 +1,75 @@
+import asyncio
+from collections import defaultdict
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.util import identity_key
+
+
+class RequestLoader:
+    """
+    Request-scoped batching loader: id lookups made in the same event loop
+    tick are resolved with one IN query per model, and every result is kept
+    in an identity cache for the rest of the request
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+        self._cache: dict[tuple[type, int], asyncio.Future] = {}
+        self._pending: dict[type, dict[int, asyncio.Future]] = defaultdict(dict)
+        self._dispatch_task: asyncio.Task | None = None
+        self._dispatch_scheduled = False
+
+    @classmethod
+    def of(cls, session: AsyncSession) -> "RequestLoader":
+        """Loader of the session, sessions live as long as a request or a script"""
+        loader = session.info.get("loader")
+        if loader is None:
+            loader = session.info["loader"] = cls(session)
+        return loader
+
+    def load(self, model: type, model_id: int) -> asyncio.Future:
+        future = self._cache.get((model, model_id))
+        if future is not None:
+            return future
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        # objects the session already holds need no query
+        obj = self.session.identity_map.get(identity_key(model, model_id))
+        if obj is not None:
+            future.set_result(obj)
+            return future
+        self._cache[(model, model_id)] = future
+        self._pending[model][model_id] = future
+        if not self._dispatch_scheduled:
+            self._dispatch_scheduled = True
+            loop.call_soon(self._schedule_dispatch)
+        return future
+
+    async def load_many(self, model: type, model_ids: list[int]) -> list:
+        return await asyncio.gather(
+            *(self.load(model, model_id) for model_id in model_ids)
+        )
+
+    def clear(self, model: type):
+        for key in [key for key in self._cache if key[0] is model]:
+            del self._cache[key]
+
+    def _schedule_dispatch(self):
+        self._dispatch_task = asyncio.ensure_future(self._dispatch())
+
+    async def _dispatch(self):
+        self._dispatch_scheduled = False
+        pending, self._pending = self._pending, defaultdict(dict)
+        for model, futures in pending.items():
+            try:
+                query = select(model).where(model.id.in_(list(futures)))
+                result = await self.session.execute(query)
+                found = {obj.id: obj for obj in result.scalars()}
+            except Exception as e:
+                for model_id, future in futures.items():
+                    self._cache.pop((model, model_id), None)
+                    future.set_exception(e)
+                continue
+            for model_id, future in futures.items():
+                future.set_result(found.get(model_id))
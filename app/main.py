@@ -1,3 +1,7 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+
 import uvicorn
 from fastapi import FastAPI
 
@@ -6,8 +10,13 @@ from fastapi.middleware.cors import CORSMiddleware
 from sqladmin import Admin
 
 from app.admin.views import LessonAdmin, TextbookAdmin, UserAdmin, UserLessonAdmin
+from app.config import settings
+from app.contents.autocomplete import word_index
 from app.contents.router import router as router_contents
-from app.database import engine
+from app.database import engine, new_session
+from app.monitoring.metrics import MetricsMiddleware, mark_process_dead
+from app.monitoring.profiling import ProfilingMiddleware
+from app.monitoring.router import router as router_monitoring
 from app.textbooks.models import Lesson, Textbook, UserLesson, UserTextbook
 from app.textbooks.router import router as router_textbooks
 from app.users.models import User
@@ -16,7 +25,22 @@ from app.users.models import User
 # from app.users.schemas import ProgressUpdate, UserCreate, UserLogin, UserRegisterDTO
 from app.users.router import router as router_users
 
-app = FastAPI()
+logging.basicConfig(level=settings.LOG_LEVEL)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    async with new_session() as session:
+        await word_index.load(session)
+    sync = asyncio.create_task(
+        word_index.poll(new_session, settings.WORD_INDEX_SYNC_SECONDS)
+    )
+    yield
+    sync.cancel()
+    mark_process_dead()
+
+
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -27,11 +51,15 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],  # Allows OPTIONS, GET, POST, etc.
     allow_headers=["*"],
+    expose_headers=["Server-Timing"],
 )
+app.add_middleware(ProfilingMiddleware)
+app.add_middleware(MetricsMiddleware)
 
 app.include_router(router_users)
 app.include_router(router_textbooks)
 app.include_router(router_contents)
+app.include_router(router_monitoring)
 
 admin = Admin(app, engine)
 
@@ -0,0 +1,63 @@
+"""add usertextbook progress counters
+
+Revision ID: 136420658b10
+Revises: 2430a5609daf
+Create Date: 2026-10-18 10:10:12.481203
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "136420658b10"
+down_revision: Union[str, None] = "2430a5609daf"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "usertextbook",
+        sa.Column(
+            "completed_lessons",
+            sa.Integer(),
+            server_default=sa.text("0"),
+            nullable=False,
+        ),
+    )
+    op.add_column(
+        "usertextbook",
+        sa.Column(
+            "total_lessons",
+            sa.Integer(),
+            server_default=sa.text("0"),
+            nullable=False,
+        ),
+    )
+    op.execute(
+        """
+        update usertextbook ut
+        set
+            total_lessons = s.total_lessons,
+            completed_lessons = s.completed_lessons,
+            completed = s.total_lessons > 0
+                and s.completed_lessons = s.total_lessons
+        from (
+            select
+                usertextbook_id,
+                count(*) as total_lessons,
+                count(*) filter (where completed) as completed_lessons
+            from userlesson
+            group by usertextbook_id
+        ) s
+        where s.usertextbook_id = ut.id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("usertextbook", "total_lessons")
+    op.drop_column("usertextbook", "completed_lessons")
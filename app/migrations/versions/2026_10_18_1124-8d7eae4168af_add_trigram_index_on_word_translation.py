@@ -0,0 +1,33 @@
+"""add trigram index on word translation
+
+Revision ID: 8d7eae4168af
+Revises: 136420658b10
+Create Date: 2026-10-18 11:24:37.902518
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "8d7eae4168af"
+down_revision: Union[str, None] = "136420658b10"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("create extension if not exists pg_trgm")
+    op.create_index(
+        "ix_word_translation_trgm",
+        "word",
+        ["translation"],
+        unique=False,
+        postgresql_using="gin",
+        postgresql_ops={"translation": "gin_trgm_ops"},
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_word_translation_trgm", table_name="word")
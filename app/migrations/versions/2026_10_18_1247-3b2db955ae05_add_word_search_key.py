@@ -0,0 +1,62 @@
+"""add word search key
+
+Revision ID: 3b2db955ae05
+Revises: 8d7eae4168af
+Create Date: 2026-10-18 12:47:05.118346
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "3b2db955ae05"
+down_revision: Union[str, None] = "8d7eae4168af"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 5_000
+
+# Frozen copy of app.contents.services.KANA_SEARCH_KEY_TABLE
+KANA_SEARCH_KEY_TABLE = str.maketrans(
+    {
+        **{chr(code): chr(code - 0x60) for code in range(0x30A1, 0x30F7)},
+        "ヽ": "ゝ",
+        "ヾ": "ゞ",
+        **{space: None for space in " \t\r\n　"},
+    }
+)
+
+
+def upgrade() -> None:
+    op.add_column("word", sa.Column("search_key", sa.String(), nullable=True))
+
+    connection = op.get_bind()
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            sa.text(
+                "select id, kana from word where id > :last_id order by id limit :limit"
+            ),
+            {"last_id": last_id, "limit": BATCH_SIZE},
+        ).all()
+        if not rows:
+            break
+        connection.execute(
+            sa.text("update word set search_key = :search_key where id = :id"),
+            [
+                {"id": row.id, "search_key": row.kana.translate(KANA_SEARCH_KEY_TABLE)}
+                for row in rows
+            ],
+        )
+        last_id = rows[-1].id
+
+    op.alter_column("word", "search_key", nullable=False)
+    op.create_index(op.f("ix_word_search_key"), "word", ["search_key"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_word_search_key"), table_name="word")
+    op.drop_column("word", "search_key")
@@ -0,0 +1,31 @@
+"""add class user_id class_date index
+
+Revision ID: e56985d06ee5
+Revises: 3b2db955ae05
+Create Date: 2026-10-18 14:02:51.370442
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e56985d06ee5"
+down_revision: Union[str, None] = "3b2db955ae05"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_class_user_id_class_date",
+        "class",
+        ["user_id", sa.text("class_date DESC")],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_class_user_id_class_date", table_name="class")
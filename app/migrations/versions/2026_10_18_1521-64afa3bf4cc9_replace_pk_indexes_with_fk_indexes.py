@@ -0,0 +1,66 @@
+"""replace pk indexes with fk indexes
+
+Revision ID: 64afa3bf4cc9
+Revises: e56985d06ee5
+Create Date: 2026-10-18 15:21:37.604219
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "64afa3bf4cc9"
+down_revision: Union[str, None] = "e56985d06ee5"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Primary keys are indexed already, these duplicates only slow down writes
+PK_INDEXED_TABLES = (
+    "textbook",
+    "user",
+    "class",
+    "lesson",
+    "usertextbook",
+    "grammar",
+    "topic",
+    "userlesson",
+    "word",
+    "classgrammar",
+    "classtopic",
+    "classuserlesson",
+    "classword",
+    "usefullink",
+)
+
+# Foreign keys that are not the leading column of any existing index
+FOREIGN_KEYS = (
+    ("lesson", "textbook_id"),
+    ("usertextbook", "textbook_id"),
+    ("userlesson", "lesson_id"),
+    ("userlesson", "usertextbook_id"),
+    ("word", "lesson_id"),
+    ("grammar", "lesson_id"),
+    ("topic", "lesson_id"),
+    ("classword", "word_id"),
+    ("classgrammar", "grammar_id"),
+    ("classtopic", "topic_id"),
+    ("classuserlesson", "userlesson_id"),
+    ("usefullink", "grammar_id"),
+    ("usefullink", "topic_id"),
+)
+
+
+def upgrade() -> None:
+    for table in PK_INDEXED_TABLES:
+        op.drop_index(op.f(f"ix_{table}_id"), table_name=table)
+    for table, column in FOREIGN_KEYS:
+        op.create_index(op.f(f"ix_{table}_{column}"), table, [column], unique=False)
+
+
+def downgrade() -> None:
+    for table, column in FOREIGN_KEYS:
+        op.drop_index(op.f(f"ix_{table}_{column}"), table_name=table)
+    for table in PK_INDEXED_TABLES:
+        op.create_index(op.f(f"ix_{table}_id"), table, ["id"], unique=False)
@@ -0,0 +1,31 @@
+"""add user is_admin
+
+Revision ID: 3cefab97b37c
+Revises: 64afa3bf4cc9
+Create Date: 2026-10-18 16:48:12.925804
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "3cefab97b37c"
+down_revision: Union[str, None] = "64afa3bf4cc9"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "user",
+        sa.Column(
+            "is_admin", sa.Boolean(), server_default=sa.text("false"), nullable=False
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("user", "is_admin")
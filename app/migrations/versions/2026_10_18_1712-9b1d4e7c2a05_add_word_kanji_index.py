@@ -0,0 +1,25 @@
+"""add word kanji index
+
+Revision ID: 9b1d4e7c2a05
+Revises: 3cefab97b37c
+Create Date: 2026-10-18 17:12:40.318274
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "9b1d4e7c2a05"
+down_revision: Union[str, None] = "3cefab97b37c"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(op.f("ix_word_kanji"), "word", ["kanji"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_word_kanji"), table_name="word")
@@ -0,0 +1,25 @@
+"""add word updated_at index
+
+Revision ID: 5e2c81f0d9b3
+Revises: 9b1d4e7c2a05
+Create Date: 2026-10-18 17:45:09.512630
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "5e2c81f0d9b3"
+down_revision: Union[str, None] = "9b1d4e7c2a05"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_word_updated_at", "word", ["updated_at"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_word_updated_at", table_name="word")
@@ -0,0 +1,38 @@
+"""order class user index like keyset
+
+Revision ID: c4a7f2e91b6d
+Revises: 5e2c81f0d9b3
+Create Date: 2026-10-18 18:20:33.804127
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c4a7f2e91b6d"
+down_revision: Union[str, None] = "5e2c81f0d9b3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_class_user_id_class_date_id",
+        "class",
+        ["user_id", "class_date", "id"],
+        unique=False,
+    )
+    op.drop_index("ix_class_user_id_class_date", table_name="class")
+
+
+def downgrade() -> None:
+    op.create_index(
+        "ix_class_user_id_class_date",
+        "class",
+        ["user_id", sa.text("class_date DESC")],
+        unique=False,
+    )
+    op.drop_index("ix_class_user_id_class_date_id", table_name="class")
@@ -0,0 +1,168 @@
+import os
+import time
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+from app.cache import caches
+from app.database import get_pool_stats
+from app.users.auth import hashing_pool
+
+# With several uvicorn workers every process writes its values into
+# PROMETHEUS_MULTIPROC_DIR and /metrics sums them up
+MULTIPROCESS = "PROMETHEUS_MULTIPROC_DIR" in os.environ
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Request latency by route template",
+    ["method", "route"],
+)
+REQUESTS = Counter(
+    "http_requests",
+    "Handled requests by route template and status",
+    ["method", "route", "status"],
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "Requests being handled right now",
+    ["method"],
+    multiprocess_mode="livesum",
+)
+
+DB_POOL_SIZE = Gauge(
+    "db_pool_size",
+    "Connections kept open by the pool",
+    multiprocess_mode="livesum",
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out",
+    "Connections in use",
+    multiprocess_mode="livesum",
+)
+DB_POOL_OVERFLOW = Gauge(
+    "db_pool_overflow",
+    "Connections opened over the pool size",
+    multiprocess_mode="livesum",
+)
+DB_POOL_CHECKOUTS = Counter(
+    "db_pool_checkouts",
+    "Connection checkouts",
+)
+DB_POOL_WAIT = Counter(
+    "db_pool_wait_seconds",
+    "Time spent waiting for a connection",
+)
+
+CACHE_SIZE = Gauge(
+    "cache_size",
+    "Entries in the in-process cache",
+    ["cache"],
+    multiprocess_mode="livesum",
+)
+CACHE_HITS = Counter("cache_hits", "Cache hits", ["cache"])
+CACHE_MISSES = Counter("cache_misses", "Cache misses", ["cache"])
+
+HASHING_RUNNING = Gauge(
+    "password_hashing_running",
+    "Password hashes being computed",
+    multiprocess_mode="livesum",
+)
+HASHING_QUEUE_DEPTH = Gauge(
+    "password_hashing_queue_depth",
+    "Password hashes waiting for a worker thread",
+    multiprocess_mode="livesum",
+)
+
+"""Counter values already exported by this process, to increment by the delta"""
+_exported: dict[tuple, float] = {}
+
+
+def _export_total(counter: Counter, value: float, *labels: str):
+    key = (counter, labels)
+    delta = value - _exported.get(key, 0)
+    if delta > 0:
+        (counter.labels(*labels) if labels else counter).inc(delta)
+    _exported[key] = value
+
+
+def sync_process_metrics():
+    """
+    Copies the pool, cache and hashing counters of this process into
+    the prometheus metrics
+    """
+    pool = get_pool_stats()
+    DB_POOL_SIZE.set(pool["size"])
+    DB_POOL_CHECKED_OUT.set(pool["checked_out"])
+    DB_POOL_OVERFLOW.set(max(pool["overflow"], 0))
+    _export_total(DB_POOL_CHECKOUTS, pool["checkouts"])
+    _export_total(DB_POOL_WAIT, pool["wait_seconds_total"])
+
+    for name, cache in caches.items():
+        stats = cache.stats()
+        CACHE_SIZE.labels(name).set(stats["size"])
+        _export_total(CACHE_HITS, stats["hits"], name)
+        _export_total(CACHE_MISSES, stats["misses"], name)
+
+    hashing = hashing_pool.stats()
+    HASHING_RUNNING.set(hashing["running"])
+    HASHING_QUEUE_DEPTH.set(hashing["queue_depth"])
+
+
+def render_metrics() -> tuple[bytes, str]:
+    sync_process_metrics()
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def mark_process_dead():
+    """Drops the live gauges of this worker when it shuts down"""
+    if MULTIPROCESS:
+        multiprocess.mark_process_dead(os.getpid())
+
+
+class MetricsMiddleware:
+    """
+    Records latency, status and in-flight requests labelled with the route
+    template (/users/{user_id}/classes/), not the raw path
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+        started = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        REQUESTS_IN_PROGRESS.labels(method).inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            REQUESTS_IN_PROGRESS.labels(method).dec()
+            route = scope.get("route")
+            route = route.path if route else "unmatched"
+            REQUEST_LATENCY.labels(method, route).observe(time.perf_counter() - started)
+            REQUESTS.labels(method, route, str(status_code)).inc()
+            sync_process_metrics()
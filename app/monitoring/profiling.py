@@ -0,0 +1,130 @@
+import json
+import logging
+import time
+from contextvars import ContextVar
+
+from sqlalchemy import event
+
+from app.config import settings
+from app.database import engine
+from app.monitoring.slow_queries import slow_query_log
+
+logger = logging.getLogger("app.profiling")
+
+
+class RequestProfile:
+    """SQL statements and database time spent by one request"""
+
+    def __init__(self, scope: dict):
+        self.scope = scope
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+
+    def record_query(self, seconds: float):
+        self.queries += 1
+        self.db_time += seconds
+
+    @property
+    def route(self) -> str:
+        """Path template of the matched route, the raw path before routing"""
+        route = self.scope.get("route")
+        return route.path if route else self.scope["path"]
+
+    @property
+    def total_time(self) -> float:
+        return time.perf_counter() - self.started
+
+    def server_timing(self) -> str:
+        return (
+            f"db;dur={self.db_time * 1000:.2f}, "
+            f"queries;desc={self.queries}, "
+            f"total;dur={self.total_time * 1000:.2f}"
+        )
+
+
+"""Profile of the request being handled, None outside of requests"""
+current_profile: ContextVar[RequestProfile | None] = ContextVar(
+    "current_profile", default=None
+)
+
+
+@event.listens_for(engine.sync_engine, "before_cursor_execute")
+def _start_query_timer(conn, cursor, statement, parameters, context, executemany):
+    # kept on the execution context, a statement that raises takes it along
+    if context is not None:
+        context._query_started = time.perf_counter()
+
+
+@event.listens_for(engine.sync_engine, "after_cursor_execute")
+def _stop_query_timer(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_query_started", None)
+    if started is None:
+        return
+    elapsed = time.perf_counter() - started
+    profile = current_profile.get()
+    if profile is not None:
+        profile.record_query(elapsed)
+    if elapsed * 1000 >= settings.SLOW_QUERY_THRESHOLD_MS and not executemany:
+        slow_query_log.record(
+            conn,
+            statement,
+            parameters,
+            elapsed,
+            route=profile.route if profile else None,
+        )
+
+
+class ProfilingMiddleware:
+    """
+    Counts SQL statements and database time of every request, reports them
+    in the Server-Timing header and a log line, and warns about requests
+    that go over settings.QUERY_BUDGET
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile(scope)
+        token = current_profile.set(profile)
+        status_code = 500
+
+        async def send_with_timing(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", profile.server_timing().encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_profile.reset(token)
+            self.log(scope, profile, status_code)
+
+    @staticmethod
+    def log(scope, profile: RequestProfile, status_code: int):
+        record = {
+            "method": scope["method"],
+            "path": profile.route,
+            "status": status_code,
+            "queries": profile.queries,
+            "db_ms": round(profile.db_time * 1000, 2),
+            "total_ms": round(profile.total_time * 1000, 2),
+        }
+        logger.info(json.dumps(record))
+        if profile.queries > settings.QUERY_BUDGET:
+            logger.warning(
+                "%s %s ran %s queries, the budget is %s",
+                record["method"],
+                record["path"],
+                profile.queries,
+                settings.QUERY_BUDGET,
+            )
@@ -0,0 +1,34 @@
+from fastapi import APIRouter, Query, Response
+
+from app.monitoring.metrics import render_metrics
+from app.monitoring.slow_queries import slow_query_log
+from app.users.services import AdminUserDep
+
+router = APIRouter(
+    tags=["Мониторинг"],
+)
+
+
+@router.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    content, media_type = render_metrics()
+    return Response(content=content, media_type=media_type)
+
+
+@router.get("/monitoring/slow_queries")
+async def get_slow_queries(
+    admin: AdminUserDep,
+    limit: int = Query(20, ge=1, le=100),
+) -> list[dict]:
+    """Slowest statements of this worker by total time"""
+    return slow_query_log.worst(limit)
+
+
+@router.put("/monitoring/slow_queries/explain")
+async def set_slow_query_explain(
+    admin: AdminUserDep,
+    enabled: bool,
+):
+    """Turns EXPLAIN ANALYZE of sampled slow SELECTs on or off in this worker"""
+    slow_query_log.explain = enabled
+    return {"explain": enabled}
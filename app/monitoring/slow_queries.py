@@ -0,0 +1,121 @@
+import json
+import logging
+import random
+import time
+from collections import deque
+
+from app.config import settings
+
+logger = logging.getLogger("app.slow_queries")
+
+
+class SlowQueryLog:
+    """
+    Bounded ring buffer of statements slower than
+    settings.SLOW_QUERY_THRESHOLD_MS, kept per worker process.
+    Parameters are stored as their types only, never the values
+    """
+
+    def __init__(self, maxsize: int, explain: bool, explain_rate: float):
+        self.entries: deque[dict] = deque(maxlen=maxsize)
+        self.explain = explain
+        self.explain_rate = explain_rate
+
+    @staticmethod
+    def redact(parameters) -> list[str]:
+        if isinstance(parameters, dict):
+            return [
+                f"{key}: {type(value).__name__}" for key, value in parameters.items()
+            ]
+        return [type(value).__name__ for value in parameters or ()]
+
+    def should_explain(self, statement: str) -> bool:
+        return (
+            self.explain
+            and statement.lstrip().lower().startswith("select")
+            and random.random() < self.explain_rate
+        )
+
+    @staticmethod
+    def explain_plan(conn, statement: str, parameters) -> str | None:
+        """
+        Runs EXPLAIN ANALYZE on a separate cursor inside a savepoint,
+        so a failing plan leaves neither the transaction nor the results
+        of the original statement broken
+        """
+        cursor = conn.connection.cursor()
+        try:
+            cursor.execute("savepoint slow_query_explain")
+            try:
+                cursor.execute(
+                    f"explain (analyze, buffers, format text) {statement}",
+                    parameters,
+                )
+                plan = "\n".join(row[0] for row in cursor.fetchall())
+            except Exception:
+                cursor.execute("rollback to savepoint slow_query_explain")
+                return None
+            cursor.execute("release savepoint slow_query_explain")
+            return plan
+        except Exception:
+            # e.g. no transaction is open to hold the savepoint
+            return None
+        finally:
+            cursor.close()
+
+    def record(
+        self,
+        conn,
+        statement: str,
+        parameters,
+        seconds: float,
+        route: str | None,
+    ):
+        entry = {
+            "statement": statement,
+            "parameters": self.redact(parameters),
+            "route": route,
+            "duration_ms": round(seconds * 1000, 2),
+            "recorded_at": time.time(),
+            "plan": None,
+        }
+        logger.warning(json.dumps({key: entry[key] for key in entry if key != "plan"}))
+        if self.should_explain(statement):
+            entry["plan"] = self.explain_plan(conn, statement, parameters)
+        self.entries.append(entry)
+
+    def worst(self, limit: int) -> list[dict]:
+        """Statements of the buffer grouped by text, slowest in total first"""
+        groups = {}
+        for entry in self.entries:
+            group = groups.setdefault(
+                entry["statement"],
+                {
+                    "statement": entry["statement"],
+                    "calls": 0,
+                    "total_ms": 0.0,
+                    "max_ms": 0.0,
+                    "routes": set(),
+                    "plan": None,
+                },
+            )
+            group["calls"] += 1
+            group["total_ms"] += entry["duration_ms"]
+            group["max_ms"] = max(group["max_ms"], entry["duration_ms"])
+            if entry["route"]:
+                group["routes"].add(entry["route"])
+            group["plan"] = entry["plan"] or group["plan"]
+
+        worst = sorted(groups.values(), key=lambda group: -group["total_ms"])
+        for group in worst:
+            group["total_ms"] = round(group["total_ms"], 2)
+            group["mean_ms"] = round(group["total_ms"] / group["calls"], 2)
+            group["routes"] = sorted(group["routes"])
+        return worst[:limit]
+
+
+slow_query_log = SlowQueryLog(
+    maxsize=settings.SLOW_QUERY_BUFFER_SIZE,
+    explain=settings.MODE != "PROD",
+    explain_rate=settings.SLOW_QUERY_EXPLAIN_RATE,
+)
@@ -0,0 +1,55 @@
+import base64
+import binascii
+import json
+from datetime import date, datetime
+from typing import Annotated, Generic, Optional, TypeVar
+
+from fastapi import Depends
+from pydantic import BaseModel, Field
+
+from app.config import settings
+from app.exceptions import IncorrectCursorException
+
+T = TypeVar("T")
+
+
+class PageParams(BaseModel):
+    cursor: Optional[str] = None
+    limit: int = Field(settings.PAGE_SIZE_DEFAULT, ge=1, le=settings.PAGE_SIZE_MAX)
+
+
+PageParamsDep = Annotated[PageParams, Depends()]
+
+
+class PageSchema(BaseModel, Generic[T]):
+    items: list[T]
+    next_cursor: Optional[str] = None
+
+
+def encode_cursor(values: list) -> str:
+    raw = json.dumps(values, default=str).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, columns: list) -> list:
+    """
+    Values of the keyset columns stored in the cursor, converted back
+    to the python types of the columns
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError
+        return [
+            _coerce(column.type.python_type, value)
+            for column, value in zip(columns, values)
+        ]
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError):
+        raise IncorrectCursorException
+
+
+def _coerce(python_type: type, value):
+    if python_type in (date, datetime):
+        return python_type.fromisoformat(value)
+    return python_type(value)
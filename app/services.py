@@ -1,18 +1,34 @@
 from asyncpg.exceptions import ForeignKeyViolationError, UniqueViolationError
 from fastapi import HTTPException
 from slugify import slugify
-from sqlalchemy import and_, delete, select, update
+from sqlalchemy import (
+    Boolean,
+    Select,
+    and_,
+    column,
+    delete,
+    literal_column,
+    select,
+    tuple_,
+    update,
+    values,
+)
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from unidecode import unidecode
 
 from app.config import settings
-from app.exceptions import ObjectAlreadyExistsException
+from app.exceptions import MultipleObjectsFoundException, ObjectAlreadyExistsException
+from app.loaders import RequestLoader
+from app.pagination import decode_cursor, encode_cursor
 
 
 class CRUDBase:
 
     model = None
+    # natural key of the model, the ON CONFLICT target of upsert_bulk
+    conflict_columns: tuple[str, ...] = ()
 
     @classmethod
     async def get_by_id(
@@ -20,9 +36,42 @@ class CRUDBase:
         session: AsyncSession,
         model_id: int,
     ):
-        query = select(cls.model).filter_by(id=model_id)
-        result = await session.execute(query)
-        return result.scalar_one_or_none()
+        return await RequestLoader.of(session).load(cls.model, model_id)
+
+    @classmethod
+    async def get_many_by_ids(
+        cls,
+        session: AsyncSession,
+        model_ids: list[int],
+    ):
+        """
+        Objects in the order of model_ids, None for missing ones.
+        Lookups gathered with it share one IN query per model
+        """
+        return await RequestLoader.of(session).load_many(cls.model, model_ids)
+
+    @classmethod
+    async def commit(
+        cls,
+        session: AsyncSession,
+    ):
+        """
+        In unit-of-work mode the request commits once at the end,
+        DAO calls only flush their changes
+        """
+        if session.info.get("unit_of_work"):
+            await session.flush()
+        else:
+            await session.commit()
+
+    @classmethod
+    def clear_loaded(
+        cls,
+        session: AsyncSession,
+    ):
+        loader = session.info.get("loader")
+        if loader is not None:
+            loader.clear(cls.model)
 
     @classmethod
     async def get_one_or_none(
@@ -44,6 +93,46 @@ class CRUDBase:
         result = await session.execute(query)
         return result.scalars().all()
 
+    @classmethod
+    async def paginate(
+        cls,
+        session: AsyncSession,
+        query: Select,
+        order_by: tuple[str, ...],
+        cursor: str | None,
+        limit: int,
+        scalars: bool = True,
+    ):
+        """
+        Keyset pagination: rows strictly after the cursor in order_by order,
+        so every page costs the same whatever its position.
+        Pass scalars=False for queries that select columns, not the model
+        """
+        columns = [getattr(cls.model, name) for name in order_by]
+        if cursor:
+            values = decode_cursor(cursor, columns)
+            query = query.where(tuple_(*columns) > tuple_(*values))
+        query = query.order_by(*columns).limit(limit + 1)
+        result = await session.execute(query)
+        items = result.scalars().all() if scalars else result.all()
+        next_cursor = None
+        if len(items) > limit:
+            items = items[:limit]
+            next_cursor = encode_cursor([getattr(items[-1], name) for name in order_by])
+        return {"items": items, "next_cursor": next_cursor}
+
+    @classmethod
+    async def get_page(
+        cls,
+        session: AsyncSession,
+        cursor: str | None,
+        limit: int,
+        order_by: tuple[str, ...] = ("id",),
+        **filters,
+    ):
+        query = select(cls.model).filter_by(**filters)
+        return await cls.paginate(session, query, order_by, cursor, limit)
+
     @classmethod
     async def get_all_by_feature(
         cls,
@@ -75,22 +164,30 @@ class CRUDBase:
         new_obj = cls.model(**data)
         session.add(new_obj)
         try:
-            await session.commit()
+            await cls.commit(session)
             await session.refresh(new_obj)
             return new_obj
         except IntegrityError as e:
-            await session.rollback()
-            error_message = str(e.orig)
-            if "UniqueViolationError" in error_message:
-                existing_object = settings.EXCEPTION_TEXT_BY_MODEL.get(
-                    cls.model.__name__, "Object"
-                )
-                print(existing_object)
-                raise ObjectAlreadyExistsException(existing_object)
-            elif "ForeignKeyViolationError" in error_message:
-                raise ValueError("Объект ссылается на несуществующую запись")
-            else:
-                raise ValueError("Ошибка целостности данных.")
+            await cls.handle_integrity_error(session, e)
+
+    @classmethod
+    async def handle_integrity_error(
+        cls,
+        session: AsyncSession,
+        e: IntegrityError,
+    ):
+        await session.rollback()
+        error_message = str(e.orig)
+        if "UniqueViolationError" in error_message:
+            existing_object = settings.EXCEPTION_TEXT_BY_MODEL.get(
+                cls.model.__name__, "Object"
+            )
+            print(existing_object)
+            raise ObjectAlreadyExistsException(existing_object)
+        elif "ForeignKeyViolationError" in error_message:
+            raise ValueError("Объект ссылается на несуществующую запись")
+        else:
+            raise ValueError("Ошибка целостности данных.")
 
     @classmethod
     async def check_add(
@@ -110,9 +207,101 @@ class CRUDBase:
     ):
         objects = [cls.model(**obj) for obj in data]
         session.add_all(objects)
-        await session.commit()
+        await cls.commit(session)
         return objects
 
+    @classmethod
+    def prepare_row(
+        cls,
+        data: dict,
+    ) -> dict:
+        """
+        Fills in values the ORM would set on its own,
+        bulk statements bypass model validators
+        """
+        return data
+
+    @classmethod
+    async def find_existing(
+        cls,
+        session: AsyncSession,
+        rows: list[dict],
+        index_elements: list[str],
+    ) -> dict[tuple, int]:
+        """
+        Ids of stored rows with the same values of index_elements,
+        NULLs compare equal here, unlike in a unique constraint
+        """
+        table = cls.model.__table__
+        keys = values(
+            *(column(name, table.c[name].type) for name in index_elements),
+            name="keys",
+        ).data([tuple(row.get(name) for name in index_elements) for row in rows])
+        query = select(cls.model.id, *(table.c[name] for name in index_elements)).join(
+            keys,
+            and_(
+                *(
+                    table.c[name].is_not_distinct_from(keys.c[name])
+                    for name in index_elements
+                )
+            ),
+        )
+        result = await session.execute(query)
+        return {tuple(row[1:]): row.id for row in result.all()}
+
+    @classmethod
+    async def upsert_bulk(
+        cls,
+        session: AsyncSession,
+        data: list[dict],
+        index_elements: list[str] | None = None,
+    ):
+        """
+        INSERT ... ON CONFLICT over conflict_columns of the DAO,
+        returns ids of the inserted rows and of the rows that already existed
+        """
+        index_elements = list(index_elements or cls.conflict_columns)
+        if not index_elements:
+            raise ValueError(f"{cls.__name__} has no conflict_columns")
+        rows = {}
+        for row in data:
+            row = cls.prepare_row(dict(row))
+            rows[tuple(row.get(column) for column in index_elements)] = row
+
+        inserted, existing = [], []
+        # the unique constraint never fires for a NULL, such rows are
+        # matched beforehand and only inserted when missing
+        nullable_keys = [key for key in rows if None in key]
+        if nullable_keys:
+            found = await cls.find_existing(
+                session, [rows[key] for key in nullable_keys], index_elements
+            )
+            for key in nullable_keys:
+                if key in found:
+                    existing.append(found[key])
+                    del rows[key]
+        rows = list(rows.values())
+
+        if not rows:
+            await cls.commit(session)
+            return {"inserted": inserted, "existing": existing}
+        # asyncpg accepts at most 32767 bind parameters per statement
+        batch_size = max(1, 32_767 // len(rows[0]))
+        for start in range(0, len(rows), batch_size):
+            stmt = pg_insert(cls.model).values(rows[start : start + batch_size])
+            stmt = stmt.on_conflict_do_update(
+                index_elements=index_elements,
+                set_={index_elements[0]: stmt.excluded[index_elements[0]]},
+            ).returning(
+                cls.model.id,
+                literal_column("xmax = 0", Boolean).label("inserted"),
+            )
+            result = await session.execute(stmt)
+            for row in result.all():
+                (inserted if row.inserted else existing).append(row.id)
+        await cls.commit(session)
+        return {"inserted": inserted, "existing": existing}
+
     @classmethod
     async def update(
         cls,
@@ -122,34 +311,55 @@ class CRUDBase:
     ):
         stmt = update(cls.model).filter_by(**filters).values(**data)
         await session.execute(stmt)
-        await session.commit()
+        await cls.commit(session)
+        cls.clear_loaded(session)
 
     @classmethod
     async def delete(
         cls,
         session: AsyncSession,
         **filters,
-    ):
-        stmt = select(cls.model).filter_by(**filters)
+    ) -> int:
+        """
+        Single DELETE ... RETURNING, dependent rows go with the database
+        cascades. The filters must match exactly one row
+        """
+        stmt = (
+            delete(cls.model)
+            .filter_by(**filters)
+            .returning(cls.model.id)
+            .execution_options(synchronize_session=False)
+        )
         result = await session.execute(stmt)
-        obj = result.scalars().one_or_none()
+        deleted_ids = result.scalars().all()
 
-        if not obj:
+        if not deleted_ids:
             raise HTTPException(status_code=404, detail="Object not found")
+        if len(deleted_ids) > 1:
+            await session.rollback()
+            raise MultipleObjectsFoundException
 
-        await session.delete(obj)
-        await session.commit()
+        await cls.commit(session)
+        cls.clear_loaded(session)
+        return deleted_ids[0]
 
     @classmethod
     async def delete_bulk(
         cls,
         session: AsyncSession,
         filters: dict[str, list],
-    ):
+    ) -> list[int]:
         conditions = [
             getattr(cls.model, column).in_(values) for column, values in filters.items()
         ]
-        stmt = delete(cls.model).where(and_(*conditions))
+        stmt = (
+            delete(cls.model)
+            .where(and_(*conditions))
+            .returning(cls.model.id)
+            .execution_options(synchronize_session=False)
+        )
         result = await session.execute(stmt)
-        await session.commit()
-        return result.rowcount
+        deleted_ids = result.scalars().all()
+        await cls.commit(session)
+        cls.clear_loaded(session)
+        return deleted_ids
@@ -1,22 +1,259 @@
+import asyncio
+
+from sqlalchemy import event, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.exceptions import ObjectNotFoundException, UnknownUsersException
 from app.services import CRUDBase
 from app.textbooks.models import Lesson, Textbook, UserLesson, UserTextbook
+from app.users.dao import CRUDUser
+
+# Lessons added after enrollment are given to every enrolled user
+ADD_LESSONS_TO_ENROLLED = text(
+    """
+    insert into userlesson (user_id, lesson_id, usertextbook_id)
+    select ut.user_id, l.id, ut.id
+    from lesson l
+    join usertextbook ut on ut.textbook_id = l.textbook_id
+    where l.id = any(cast(:lesson_ids as integer[]))
+    on conflict (user_id, lesson_id) do nothing
+    """
+)
+
+RECOUNT_PROGRESS = text(
+    """
+    update usertextbook ut
+    set
+        total_lessons = c.total,
+        completed_lessons = c.done,
+        completed = c.total > 0 and c.done = c.total,
+        updated_at = now()
+    from (
+        select
+            ut.id,
+            count(ul.id) as total,
+            count(ul.id) filter (where ul.completed) as done
+        from usertextbook ut
+        left join userlesson ul on ul.usertextbook_id = ut.id
+        where ut.textbook_id = any(cast(:textbook_ids as integer[]))
+        group by ut.id
+    ) c
+    where ut.id = c.id
+    """
+)
 
 
 class CRUDTextbook(CRUDBase):
 
     model = Textbook
+    conflict_columns = ("name",)
 
 
 class CRUDLesson(CRUDBase):
 
     model = Lesson
+    conflict_columns = ("name", "textbook_id")
+
+    @classmethod
+    async def upsert_bulk(
+        cls,
+        session: AsyncSession,
+        data: list[dict],
+        index_elements: list[str] | None = None,
+    ):
+        """
+        Bulk statements bypass the ORM events below,
+        so the new lessons are given to enrolled users here
+        """
+        result = await super().upsert_bulk(session, data, index_elements)
+        if result["inserted"]:
+            await session.execute(
+                ADD_LESSONS_TO_ENROLLED, {"lesson_ids": result["inserted"]}
+            )
+            textbook_ids = list({row["textbook_id"] for row in data})
+            await session.execute(RECOUNT_PROGRESS, {"textbook_ids": textbook_ids})
+            await cls.commit(session)
+        return result
 
 
 class CRUDUserTextbook(CRUDBase):
 
     model = UserTextbook
 
+    @classmethod
+    async def get_progress_tree(
+        cls,
+        session: AsyncSession,
+        user_id: int,
+    ):
+        """
+        Textbooks of the user with their lessons and completion flags,
+        aggregated by Postgres into JSON in a single round trip
+        """
+        query = text(
+            """
+            select
+                t.id,
+                t.name,
+                ut.completed,
+                ut.completed_lessons,
+                ut.total_lessons,
+                coalesce(
+                    json_agg(
+                        json_build_object(
+                            'id', ul.id,
+                            'name', l.name,
+                            'completed', ul.completed
+                        )
+                        order by l.id
+                    ) filter (where ul.id is not null),
+                    '[]'
+                ) as lessons
+            from usertextbook ut
+            join textbook t on t.id = ut.textbook_id
+            left join userlesson ul on ul.usertextbook_id = ut.id
+            left join lesson l on l.id = ul.lesson_id
+            where ut.user_id = :user_id
+            group by ut.id, t.id, t.name
+            order by t.id
+            """
+        )
+        result = await session.execute(query, {"user_id": user_id})
+        return result.mappings().all()
+
+    @classmethod
+    async def check_enrollment_targets(
+        cls,
+        session: AsyncSession,
+        user_ids: list[int],
+        textbook_id: int,
+    ):
+        """
+        Gathered lookups, under the request loader each model is
+        resolved with one IN query
+        """
+        textbook, users = await asyncio.gather(
+            CRUDTextbook.get_by_id(session, textbook_id),
+            CRUDUser.get_many_by_ids(session, user_ids),
+        )
+        if textbook is None:
+            raise ObjectNotFoundException(detail="Учебник не найден")
+        unknown_user_ids = sorted(
+            {user_id for user_id, user in zip(user_ids, users) if user is None}
+        )
+        if unknown_user_ids:
+            raise UnknownUsersException(unknown_user_ids)
+
+    @classmethod
+    async def enroll_users(
+        cls,
+        session: AsyncSession,
+        user_ids: list[int],
+        textbook_id: int,
+    ):
+        """
+        Adds the textbook and all of its lessons for every user in one
+        INSERT ... SELECT statement, lessons never leave the database.
+        Users already enrolled are skipped and returned in skipped_user_ids
+        """
+        await cls.check_enrollment_targets(session, user_ids, textbook_id)
+        stmt = text(
+            """
+            with requested as (
+                select distinct u.user_id
+                from unnest(cast(:user_ids as integer[])) as u(user_id)
+            ), ut as (
+                insert into usertextbook (user_id, textbook_id, total_lessons)
+                select
+                    r.user_id,
+                    cast(:textbook_id as integer),
+                    (select count(*) from lesson where textbook_id = :textbook_id)
+                from requested r
+                on conflict (user_id, textbook_id) do nothing
+                returning id, user_id
+            ), ul as (
+                insert into userlesson (user_id, lesson_id, usertextbook_id)
+                select ut.user_id, l.id, ut.id
+                from ut
+                join lesson l on l.textbook_id = :textbook_id
+                returning id
+            )
+            select
+                (select count(*) from ut) as usertextbooks,
+                (select count(*) from ul) as userlessons,
+                array(
+                    select r.user_id
+                    from requested r
+                    where r.user_id not in (select user_id from ut)
+                    order by r.user_id
+                ) as skipped_user_ids
+            """
+        )
+        try:
+            result = await session.execute(
+                stmt,
+                {"user_ids": user_ids, "textbook_id": textbook_id},
+            )
+            counts = result.mappings().one()
+            await cls.commit(session)
+            return counts
+        except IntegrityError as e:
+            await cls.handle_integrity_error(session, e)
+
 
 class CRUDUserLesson(CRUDBase):
 
     model = UserLesson
+
+    @classmethod
+    async def update_status(
+        cls,
+        session: AsyncSession,
+        userlesson_id: int,
+        completed: bool,
+    ):
+        """
+        Sets the lesson status and moves the progress counters of the parent
+        usertextbook in the same statement; the textbook is rolled up as
+        completed once every lesson is done
+        """
+        stmt = text(
+            """
+            with changed as (
+                update userlesson
+                set completed = :completed, updated_at = now()
+                where id = :userlesson_id and completed <> :completed
+                returning usertextbook_id
+            )
+            update usertextbook ut
+            set
+                completed_lessons = ut.completed_lessons + :delta,
+                completed = ut.completed_lessons + :delta = ut.total_lessons,
+                updated_at = now()
+            from changed
+            where ut.id = changed.usertextbook_id
+            """
+        )
+        await session.execute(
+            stmt,
+            {
+                "userlesson_id": userlesson_id,
+                "completed": completed,
+                "delta": 1 if completed else -1,
+            },
+        )
+        await cls.commit(session)
+
+
+# Lessons added or deleted through the ORM (e.g. in sqladmin) keep
+# the progress counters of enrolled users in step
+@event.listens_for(Lesson, "after_insert")
+def _add_lesson_to_enrolled(mapper, connection, target):
+    connection.execute(ADD_LESSONS_TO_ENROLLED, {"lesson_ids": [target.id]})
+    connection.execute(RECOUNT_PROGRESS, {"textbook_ids": [target.textbook_id]})
+
+
+@event.listens_for(Lesson, "after_delete")
+def _recount_after_lesson_removal(mapper, connection, target):
+    connection.execute(RECOUNT_PROGRESS, {"textbook_ids": [target.textbook_id]})
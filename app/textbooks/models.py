@@ -1,6 +1,6 @@
 from typing import TYPE_CHECKING, Optional
 
-from sqlalchemy import ForeignKey, Integer, UniqueConstraint, and_, text
+from sqlalchemy import ForeignKey, UniqueConstraint, and_, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
@@ -36,7 +36,8 @@ class Lesson(Base):
         nullable=True,
     )
     textbook_id: Mapped[int] = mapped_column(
-        ForeignKey("textbook.id", ondelete="CASCADE")
+        ForeignKey("textbook.id", ondelete="CASCADE"),
+        index=True,
     )
     __table_args__ = (UniqueConstraint("name", "textbook_id"),)
 
@@ -53,7 +54,6 @@ class Lesson(Base):
 
 
 class UserTextbook(Base):
-    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     user_id: Mapped[int] = mapped_column(
         ForeignKey("user.id", ondelete="CASCADE"),
         nullable=False,
@@ -61,12 +61,23 @@ class UserTextbook(Base):
     textbook_id: Mapped[int] = mapped_column(
         ForeignKey("textbook.id", ondelete="CASCADE"),
         nullable=False,
+        index=True,
     )
     completed: Mapped[bool] = mapped_column(
         nullable=False,
         default=False,
         server_default=text("false"),
     )
+    completed_lessons: Mapped[int] = mapped_column(
+        nullable=False,
+        default=0,
+        server_default=text("0"),
+    )
+    total_lessons: Mapped[int] = mapped_column(
+        nullable=False,
+        default=0,
+        server_default=text("0"),
+    )
     __table_args__ = (UniqueConstraint("user_id", "textbook_id"),)
 
     user: Mapped["User"] = relationship(viewonly=True)
@@ -77,11 +88,10 @@ class UserTextbook(Base):
     )
 
     def __repr__(self):
-        return f"{self.user}: {self.textbook}"
+        return f"{self.loaded_or_id('user')}: {self.loaded_or_id('textbook')}"
 
 
 class UserLesson(Base):
-    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     user_id: Mapped[int] = mapped_column(
         ForeignKey("user.id", ondelete="CASCADE"),
         nullable=False,
@@ -89,11 +99,13 @@ class UserLesson(Base):
     lesson_id: Mapped[int] = mapped_column(
         ForeignKey("lesson.id", ondelete="CASCADE"),
         nullable=False,
+        index=True,
     )
     # TODO: возможно нужно убрать, так как обхожусь сырым SQL
     usertextbook_id: Mapped[int] = mapped_column(
         ForeignKey("usertextbook.id", ondelete="CASCADE"),
         nullable=False,
+        index=True,
     )
     # TODO: server-default - не работает
     completed: Mapped[bool] = mapped_column(
@@ -114,4 +126,4 @@ class UserLesson(Base):
     )
 
     def __repr__(self):
-        return f"{self.user}: {self.lesson}"
+        return f"{self.loaded_or_id('user')}: {self.loaded_or_id('lesson')}"
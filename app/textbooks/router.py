@@ -3,14 +3,18 @@ from slugify import slugify
 from sqlalchemy import select, text
 from unidecode import unidecode
 
-from app.database import SessionDep
+from app.database import SessionDep, UnitOfWorkSessionDep
+from app.exceptions import ObjectAlreadyExistsException
+from app.pagination import PageParamsDep, PageSchema
 from app.textbooks.dao import CRUDLesson, CRUDTextbook, CRUDUserLesson, CRUDUserTextbook
 from app.textbooks.models import Lesson, Textbook, UserLesson, UserTextbook
 from app.textbooks.schemas import (
+    CohortTextbookCreateSchema,
     LessonCreateSchema,
+    TextbookBriefSchema,
     TextbookCreateSchema,
-    TextbookGetSchema,
     UserTextbookCreateSchema,
+    UserTextbookProgressSchema,
 )
 from app.users.schemas import UserGetSchema
 from app.users.services import CurrentUserDep
@@ -23,7 +27,7 @@ router = APIRouter(
 
 @router.post("/create_textbook")
 async def create_textbook(
-    session: SessionDep,
+    session: UnitOfWorkSessionDep,
     textbook_data: TextbookCreateSchema,
 ):
     textbook = await CRUDTextbook.check_add(
@@ -36,88 +40,92 @@ async def create_textbook(
 
 @router.post("/create_lesson")
 async def create_lesson(
-    session: SessionDep,
+    session: UnitOfWorkSessionDep,
     lesson_data: LessonCreateSchema,
 ):
     lesson = await CRUDLesson.check_add(
         session=session,
-        data=lesson_data.model_dump(),
+        **lesson_data.model_dump(),
     )
     return {"msg": f"Lesson {lesson} created."}
 
 
-# TODO: refactor bulk actions
 # TODO: rethink the DOM
 @router.post("/create_many_lessons")
 async def create_lessons(
-    session: SessionDep,
+    session: UnitOfWorkSessionDep,
     lessons_data: list[LessonCreateSchema],
 ):
-    names = [x.name for x in lessons_data]
-    existing_lessons = await CRUDLesson.get_all_by_feature(
-        session=session,
-        feature="name",
-        feature_list=names,
-    )
-    if existing_lessons:
-        raise Exception(f"Lessons {existing_lessons} already exist.")
     for lesson_data in lessons_data:
         if not lesson_data.slug:
             lesson_data.slug = slugify(unidecode(lesson_data.name), allow_unicode=True)
-    lessons = await CRUDLesson.add_bulk(
+    result = await CRUDLesson.upsert_bulk(
         session,
-        [dict(x) for x in lessons_data],
+        [lesson_data.model_dump() for lesson_data in lessons_data],
     )
     return {
-        "msg": f"Next lessons created: "
-        f"{', '.join([lesson.name for lesson in lessons])}"
+        "msg": f"{len(result['inserted'])} lessons created, "
+        f"{len(result['existing'])} already existed.",
+        **result,
     }
 
 
 @router.post("/add_textbook_for_user")
 async def add_textbook_for_user(
-    session: SessionDep,
+    session: UnitOfWorkSessionDep,
     data: UserTextbookCreateSchema,
 ):
-    usertextbook = await CRUDUserTextbook.add(
+    counts = await CRUDUserTextbook.enroll_users(
         session=session,
-        user_id=data.user_id,
+        user_ids=[data.user_id],
         textbook_id=data.textbook_id,
     )
-    usertextbook_id = usertextbook.id
-    lessons = await CRUDLesson.get_all(
+    if counts["skipped_user_ids"]:
+        raise ObjectAlreadyExistsException("Такой учебник у пользователя")
+    return {
+        "msg": f"Textbook {data.textbook_id} added for user {data.user_id} "
+        f"with {counts['userlessons']} lessons."
+    }
+
+
+@router.post("/add_textbook_for_users")
+async def add_textbook_for_users(
+    session: UnitOfWorkSessionDep,
+    data: CohortTextbookCreateSchema,
+):
+    counts = await CRUDUserTextbook.enroll_users(
         session=session,
-        textbook_id=usertextbook.textbook_id,
+        user_ids=data.user_ids,
+        textbook_id=data.textbook_id,
     )
-    lessons_ids = [lesson.id for lesson in lessons]
-    userlessons = [
-        {
-            "user_id": data.user_id,
-            "lesson_id": lesson_id,
-            "usertextbook_id": usertextbook_id,
-        }
-        for lesson_id in lessons_ids
-    ]
-    await CRUDUserLesson.add_bulk(session, userlessons)
     return {
-        "msg": f"Textbook {usertextbook.textbook_id} added for user {usertextbook.user_id}."
+        "msg": f"Textbook {data.textbook_id} added for "
+        f"{counts['usertextbooks']} users with {counts['userlessons']} lessons.",
+        "skipped_user_ids": counts["skipped_user_ids"],
     }
 
 
 @router.get("/all")
-async def get_all(session: SessionDep) -> list[TextbookGetSchema]:
-    return await CRUDTextbook.get_all(session)
+async def get_all(
+    session: SessionDep,
+    page: PageParamsDep,
+) -> PageSchema[TextbookBriefSchema]:
+    return await CRUDTextbook.get_page(
+        session,
+        cursor=page.cursor,
+        limit=page.limit,
+    )
 
 
 @router.post("/update_lesson_status")
 async def update_lesson_status(
-    session: SessionDep,
+    session: UnitOfWorkSessionDep,
     userlesson_id: int,
     completed: bool,
 ):
-    await CRUDUserLesson.update(
+    await CRUDUserLesson.update_status(
         session=session,
-        filters={"id": userlesson_id},
+        userlesson_id=userlesson_id,
         completed=completed,
     )
     return f"msg: Lesson {userlesson_id} completion status updated to {completed}."
@@ -127,35 +135,11 @@ async def update_lesson_status(
 async def get_user_lessons(
     session: SessionDep,
     user: CurrentUserDep,
-):
-    ut_query = text(
-        """
-        select t.id, t.name, ut.completed
-        from usertextbook ut
-        join textbook t on t.id = ut.textbook_id
-        where ut.user_id = :user_id
-        """
+) -> list[UserTextbookProgressSchema]:
+    return await CRUDUserTextbook.get_progress_tree(
+        session=session,
+        user_id=user.id,
     )
-    res = await session.execute(ut_query, {"user_id": user.id})
-    usertextbooks = res.mappings().all()
-    usertextbooks = [dict(ut) for ut in usertextbooks]
-
-    for i, ut in enumerate(usertextbooks):
-        ul_query = text(
-            """
-            select ul.id, l.name, ul.completed
-            from userlesson ul
-            join lesson l on l.id = ul.lesson_id
-            where ul.user_id = :user_id and ul.lesson_id in (select id from lesson l where l.textbook_id = :textbook_id)
-            """
-        )
-        res = await session.execute(
-            ul_query, {"user_id": user.id, "textbook_id": ut["id"]}
-        )
-        lessons = [dict(row) for row in res.mappings().all()]
-        usertextbooks[i]["lessons"] = lessons
-
-    return usertextbooks
 
     # query = (
     #     select(UserTextbook)
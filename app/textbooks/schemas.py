@@ -1,4 +1,6 @@
-from pydantic import BaseModel, EmailStr
+from typing import Optional
+
+from pydantic import BaseModel, EmailStr, Field
 
 
 class TextbookCreateSchema(BaseModel):
@@ -6,6 +8,12 @@ class TextbookCreateSchema(BaseModel):
     slug: str
 
 
+class TextbookBriefSchema(BaseModel):
+    id: int
+    name: str
+    slug: Optional[str] = None
+
+
 class TextbookGetSchema(BaseModel):
     id: int
     name: str
@@ -18,6 +26,11 @@ class LessonCreateSchema(BaseModel):
     textbook_id: int
 
 
+class LessonBriefSchema(BaseModel):
+    id: int
+    name: str
+
+
 class LessonGetSchema(BaseModel):
     id: int
     name: str
@@ -29,6 +42,11 @@ class UserTextbookCreateSchema(BaseModel):
     textbook_id: int
 
 
+class CohortTextbookCreateSchema(BaseModel):
+    user_ids: list[int] = Field(min_length=1)
+    textbook_id: int
+
+
 class UserTextbookGetSchema(BaseModel):
     id: int
     user_id: int
@@ -46,3 +64,20 @@ class UserLessonGetSchema(BaseModel):
     user_id: int
     lesson_id: int
     usertextbook_id: int
+
+
+class UserLessonProgressSchema(BaseModel):
+    id: int
+    name: str
+    completed: bool
+
+
+class UserTextbookProgressSchema(TextbookGetSchema):
+    completed_lessons: int
+    total_lessons: int
+    lessons: list[UserLessonProgressSchema]
+
+
+class UserLessonDetailSchema(UserLessonGetSchema):
+    completed: bool
+    lesson: LessonBriefSchema
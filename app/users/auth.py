@@ -1,3 +1,6 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 
 from jose import jwt
@@ -17,12 +20,58 @@ pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 # TODO: user better hashing (https://stepik.org/lesson/919993/step/5?unit=925776)
 
 
-def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+class HashingPool:
+    """
+    Bounded thread pool for bcrypt, so hashing doesn't block the event loop
+    """
 
+    def __init__(self, max_workers: int):
+        self.max_workers = max_workers
+        self.pending = 0
+        self.running = 0
+        self.completed = 0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix="bcrypt",
+        )
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    def _call(self, fn, *args):
+        with self._lock:
+            self.running += 1
+        try:
+            return fn(*args)
+        finally:
+            with self._lock:
+                self.running -= 1
+
+    async def run(self, fn, *args):
+        loop = asyncio.get_running_loop()
+        self.pending += 1
+        try:
+            return await loop.run_in_executor(self._executor, self._call, fn, *args)
+        finally:
+            self.pending -= 1
+            self.completed += 1
+
+    def stats(self) -> dict:
+        return {
+            "max_workers": self.max_workers,
+            "running": self.running,
+            "queue_depth": self.pending - self.running,
+            "completed": self.completed,
+        }
+
+
+hashing_pool = HashingPool(max_workers=settings.PASSWORD_HASH_WORKERS)
+
+
+async def get_password_hash(password: str) -> str:
+    return await hashing_pool.run(pwd_context.hash, password)
+
+
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return await hashing_pool.run(pwd_context.verify, plain_password, hashed_password)
 
 
 def create_access_token(data: dict, expires_delta: timedelta = timedelta(minutes=240)):
@@ -38,6 +87,6 @@ async def authenticate_user(session: AsyncSession, email: EmailStr, password: st
         session=session,
         email=email,
     )
-    if not (user and verify_password(password, user.hashed_password)):
+    if not (user and await verify_password(password, user.hashed_password)):
         raise IncorrectEmailOrPasswordException
     return user
@@ -1,10 +1,112 @@
+from sqlalchemy import event, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.cache import TTLCache
+from app.config import settings
 from app.exceptions import IncorrectEmailOrPasswordException
 from app.services import CRUDBase
 from app.users.models import User
+from app.users.schemas import UserIdentitySchema
+
+identity_cache = TTLCache(
+    "user_identity",
+    maxsize=settings.AUTH_CACHE_SIZE,
+    ttl=settings.AUTH_CACHE_TTL,
+)
 
 
 class CRUDUser(CRUDBase):
 
     model = User
+
+    @classmethod
+    async def get_identity(
+        cls,
+        session: AsyncSession,
+        user_id: int,
+    ) -> UserIdentitySchema | None:
+        """
+        Slim projection of the user used for authentication, cached by id
+        """
+        identity = identity_cache.get(user_id)
+        if identity is not None:
+            return identity
+        query = select(
+            cls.model.id,
+            cls.model.name,
+            cls.model.slug,
+            cls.model.email,
+            cls.model.is_admin,
+        ).filter_by(id=user_id)
+        result = await session.execute(query)
+        row = result.mappings().one_or_none()
+        if row is None:
+            return None
+        identity = UserIdentitySchema.model_validate(row)
+        identity_cache.set(user_id, identity)
+        return identity
+
+    @classmethod
+    async def is_admin(
+        cls,
+        session: AsyncSession,
+        user_id: int,
+    ) -> bool:
+        """
+        Uncached, the identity cache of other workers may still hold
+        a revoked is_admin
+        """
+        query = select(cls.model.is_admin).filter_by(id=user_id)
+        return bool(await session.scalar(query))
+
+    @classmethod
+    def invalidate_identity(cls, filters: dict):
+        if "id" not in filters:
+            identity_cache.clear()
+            return
+        user_ids = filters["id"]
+        cls.invalidate_identities(
+            user_ids if isinstance(user_ids, list) else [user_ids]
+        )
+
+    @classmethod
+    def invalidate_identities(cls, user_ids: list[int]):
+        for user_id in user_ids:
+            identity_cache.pop(user_id)
+
+    @classmethod
+    async def update(
+        cls,
+        session: AsyncSession,
+        filters: dict,
+        **data,
+    ):
+        await super().update(session, filters, **data)
+        cls.invalidate_identity(filters)
+
+    @classmethod
+    async def delete(
+        cls,
+        session: AsyncSession,
+        **filters,
+    ) -> int:
+        user_id = await super().delete(session, **filters)
+        cls.invalidate_identities([user_id])
+        return user_id
+
+    @classmethod
+    async def delete_bulk(
+        cls,
+        session: AsyncSession,
+        filters: dict[str, list],
+    ) -> list[int]:
+        user_ids = await super().delete_bulk(session, filters)
+        cls.invalidate_identities(user_ids)
+        return user_ids
+
+
+# Changes made through the ORM (e.g. in sqladmin) bypass the methods above
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_identity(mapper, connection, target):
+    identity_cache.pop(target.id)
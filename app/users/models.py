@@ -1,5 +1,6 @@
 from typing import TYPE_CHECKING, Optional
 
+from sqlalchemy import text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
@@ -18,6 +19,11 @@ class User(Base):
     )
     email: Mapped[str] = mapped_column(unique=True)
     hashed_password: Mapped[Optional[str]] = mapped_column(nullable=True)
+    is_admin: Mapped[bool] = mapped_column(
+        nullable=False,
+        default=False,
+        server_default=text("false"),
+    )
 
     textbooks: Mapped[Optional[list["Textbook"]]] = relationship(
         back_populates="users",
@@ -5,8 +5,9 @@ from unidecode import unidecode
 from app.classes.dao import CRUDClass
 from app.classes.router import router as classes_router
 from app.classes.schemas import ClassGetSchema
-from app.database import SessionDep
+from app.database import SessionDep, UnitOfWorkSessionDep
 from app.exceptions import EmailAlreadyExistsException
+from app.pagination import PageParamsDep, PageSchema
 from app.users.auth import authenticate_user, create_access_token, get_password_hash
 from app.users.dao import CRUDUser
 from app.users.schemas import (
@@ -27,7 +28,7 @@ router.include_router(classes_router, prefix="/{user_id}")
 
 @router.post("/register")
 async def register_user(
-    session: SessionDep,
+    session: UnitOfWorkSessionDep,
     user_data: UserCreateSchema,
 ):
     user = await CRUDUser.check_add(
@@ -35,7 +36,7 @@ async def register_user(
         name=user_data.name,
         slug=user_data.slug,
         email=user_data.email,
-        hashed_password=get_password_hash(user_data.password),
+        hashed_password=await get_password_hash(user_data.password),
     )
     return {"msg": f"Создан {user}."}
 
@@ -75,8 +76,15 @@ async def get_current_user(
 
 
 @router.get("")
-async def get_users(session: SessionDep) -> list[UserGetSchema]:
-    result = await CRUDUser.get_all(session)
+async def get_users(
+    session: SessionDep,
+    page: PageParamsDep,
+) -> PageSchema[UserGetSchema]:
+    result = await CRUDUser.get_page(
+        session,
+        cursor=page.cursor,
+        limit=page.limit,
+    )
     return result
 
 
@@ -88,9 +96,19 @@ async def get_user_by_id(
     return await CRUDUser.get_by_id(session, user_id)
 
 
-@router.delete("/{user_name}")
+@router.delete("/id/{user_id}")
+async def delete_user_by_id(
+    session: UnitOfWorkSessionDep,
+    user_id: int,
+):
+    await CRUDUser.delete(session=session, id=user_id)
+    return {"msg": "User deleted."}
+
+
+# user names are not unique, a name shared by several users deletes nobody
+@router.delete("/{user_name}", deprecated=True)
 async def delete_user(
-    session: SessionDep,
+    session: UnitOfWorkSessionDep,
     user_name: str,
 ):
     await CRUDUser.delete(session=session, name=user_name)
@@ -99,11 +117,11 @@ async def delete_user(
 
 @router.delete("/")
 async def bulk_delete_users(
-    session: SessionDep,
+    session: UnitOfWorkSessionDep,
     filters: dict[str, list],
 ):
-    result = await CRUDUser.delete_bulk(
+    user_ids = await CRUDUser.delete_bulk(
         session=session,
         filters=filters,
     )
-    return {"msg": f"{result} users deleted."}
+    return {"msg": f"{len(user_ids)} users deleted."}
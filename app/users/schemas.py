@@ -1,3 +1,5 @@
+from typing import Optional
+
 from pydantic import BaseModel, EmailStr
 
 
@@ -11,6 +13,13 @@ class UserGetSchema(UserIdGetSchema):
     email: EmailStr
 
 
+class UserIdentitySchema(UserIdGetSchema):
+    name: str
+    slug: Optional[str] = None
+    email: EmailStr
+    is_admin: bool = False
+
+
 class UserCreateSchema(BaseModel):
     name: str
     slug: str
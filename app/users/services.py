@@ -1,3 +1,4 @@
+import time
 from datetime import datetime, timezone
 from typing import Annotated
 
@@ -7,16 +8,24 @@ from slugify import slugify
 from sqlalchemy.ext.asyncio import AsyncSession
 from unidecode import unidecode
 
+from app.cache import TTLCache
 from app.config import settings
 from app.database import SessionDep
 from app.exceptions import (
     EmailAlreadyExistsException,
+    ForbiddenException,
     IncorrectTokenFormatException,
     TokenExpiredException,
     UserNotFoundException,
 )
 from app.users.dao import CRUDUser
-from app.users.schemas import UserCreateSchema, UserGetSchema
+from app.users.schemas import UserCreateSchema, UserGetSchema, UserIdentitySchema
+
+token_cache = TTLCache(
+    "auth_token",
+    maxsize=settings.AUTH_CACHE_SIZE,
+    ttl=settings.AUTH_CACHE_TTL,
+)
 
 
 async def check_user_exists(
@@ -47,24 +56,42 @@ def get_token(request: Request):
     return token
 
 
-async def get_current_user(
-    session: SessionDep,
-    token: str = Depends(get_token),
-):
+def decode_token(token: str) -> dict:
+    """
+    Verified claims of the token, cached until the token expires
+    """
+    payload = token_cache.get(token)
+    if payload is not None:
+        if payload["exp"] <= time.time():
+            token_cache.pop(token)
+            raise TokenExpiredException
+        return payload
     try:
         payload = jwt.decode(
             token,
             settings.SECRET_KEY,
             settings.ALGORITHM,
         )
-    except JWTError:
-        raise IncorrectTokenFormatException
     except ExpiredSignatureError:
         raise TokenExpiredException
+    except JWTError:
+        raise IncorrectTokenFormatException
+    # a validly signed token without exp would never expire
+    if not isinstance(payload.get("exp"), (int, float)):
+        raise IncorrectTokenFormatException
+    token_cache.set(token, payload, ttl=payload["exp"] - time.time())
+    return payload
+
+
+async def get_current_user(
+    session: SessionDep,
+    token: str = Depends(get_token),
+):
+    payload = decode_token(token)
     user_id = payload.get("sub")
     if not user_id:
         raise UserNotFoundException
-    user = await CRUDUser.get_by_id(
+    user = await CRUDUser.get_identity(
         session,
         int(user_id),
     )
@@ -73,4 +100,13 @@ async def get_current_user(
     return user
 
 
-CurrentUserDep = Annotated[UserGetSchema, Depends(get_current_user)]
+CurrentUserDep = Annotated[UserIdentitySchema, Depends(get_current_user)]
+
+
+async def get_current_admin(session: SessionDep, user: CurrentUserDep):
+    if not await CRUDUser.is_admin(session, user.id):
+        raise ForbiddenException
+    return user
+
+
+AdminUserDep = Annotated[UserIdentitySchema, Depends(get_current_admin)]
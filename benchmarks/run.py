@@ -0,0 +1,253 @@
+import argparse
+import asyncio
+import json
+import logging
+import math
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+import httpx
+from sqlalchemy import func, select
+
+from app.contents.models import Word
+from app.database import new_session
+from app.main import app
+from app.users.models import User
+from benchmarks.seed import BENCHMARK_PASSWORD, user_email
+
+METRICS = ("p50_ms", "p95_ms", "p99_ms", "throughput_rps", "queries_per_request")
+# metrics where a bigger number is an improvement
+HIGHER_IS_BETTER = {"throughput_rps"}
+
+
+def percentile(values: list[float], percent: float) -> float:
+    """Nearest-rank percentile"""
+    ordered = sorted(values)
+    rank = max(math.ceil(percent / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def parse_queries(server_timing: str | None) -> int | None:
+    """Query count from the Server-Timing header set by ProfilingMiddleware"""
+    for metric in (server_timing or "").split(","):
+        name, _, params = metric.strip().partition(";")
+        if name == "queries":
+            return int(params.partition("=")[2])
+    return None
+
+
+class Scenario:
+    """Fires requests at one endpoint from concurrent clients"""
+
+    def __init__(self, name: str, make_request, clients: list[httpx.AsyncClient]):
+        self.name = name
+        self.make_request = make_request
+        self.clients = clients
+        self.latencies: list[float] = []
+        self.queries: list[int] = []
+        self.errors = 0
+
+    async def worker(
+        self, client: httpx.AsyncClient, requests: int, rng: random.Random
+    ):
+        for _ in range(requests):
+            started = time.perf_counter()
+            response = await self.make_request(client, rng)
+            self.latencies.append(time.perf_counter() - started)
+            if response.is_error:
+                self.errors += 1
+            queries = parse_queries(response.headers.get("server-timing"))
+            if queries is not None:
+                self.queries.append(queries)
+
+    async def run(self, concurrency: int, requests: int, random_seed: int) -> dict:
+        per_worker = max(requests // concurrency, 1)
+        started = time.perf_counter()
+        await asyncio.gather(
+            *(
+                self.worker(
+                    self.clients[number % len(self.clients)],
+                    per_worker,
+                    random.Random(random_seed + number),
+                )
+                for number in range(concurrency)
+            )
+        )
+        elapsed = time.perf_counter() - started
+        return {
+            "requests": len(self.latencies),
+            "errors": self.errors,
+            "p50_ms": round(percentile(self.latencies, 50) * 1000, 2),
+            "p95_ms": round(percentile(self.latencies, 95) * 1000, 2),
+            "p99_ms": round(percentile(self.latencies, 99) * 1000, 2),
+            "throughput_rps": round(len(self.latencies) / elapsed, 1),
+            "queries_per_request": (
+                round(sum(self.queries) / len(self.queries), 2)
+                if self.queries
+                else None
+            ),
+        }
+
+
+async def load_fixtures(users: int, words: int, random_seed: int) -> tuple[list, list]:
+    """Seeded users and a sample of seeded words to request"""
+    rng = random.Random(random_seed)
+    async with new_session() as session:
+        total_users = await session.scalar(select(func.count(User.id)))
+        result = await session.execute(
+            select(Word.kana, Word.translation).order_by(Word.id)
+        )
+        all_words = result.all()
+    if not total_users or not all_words:
+        raise SystemExit("The database is empty, run python -m benchmarks.seed first")
+    user_numbers = rng.sample(range(total_users), min(users, total_users))
+    sample = rng.sample(all_words, min(words, len(all_words)))
+    return [user_email(number) for number in user_numbers], sample
+
+
+async def run_benchmark(args: argparse.Namespace) -> dict:
+    emails, words = await load_fixtures(args.users, 1_000, args.seed)
+    transport = httpx.ASGITransport(app=app)
+
+    def new_client() -> httpx.AsyncClient:
+        return httpx.AsyncClient(transport=transport, base_url="http://benchmark")
+
+    # login sets the cookie of whoever logged in, so it gets its own clients
+    login_clients = [new_client() for _ in range(args.concurrency)]
+    clients = [new_client() for _ in emails]
+    user_ids = {}
+
+    async def login(client, rng):
+        return await client.post(
+            "/users/login",
+            json={"email": rng.choice(emails), "password": BENCHMARK_PASSWORD},
+        )
+
+    async def textbooks(client, rng):
+        return await client.get("/textbooks/")
+
+    async def classes(client, rng):
+        return await client.get(f"/users/{user_ids[client]}/classes/")
+
+    async def popup_word(client, rng):
+        kana, translation = rng.choice(words)
+        return await client.request(
+            "GET",
+            "/contents/popup_word",
+            json={"kana": kana, "translation": translation},
+        )
+
+    results = {}
+    async with app.router.lifespan_context(app):
+        # every client keeps the cookie of its own user
+        for client, email in zip(clients, emails):
+            response = await client.post(
+                "/users/login",
+                json={"email": email, "password": BENCHMARK_PASSWORD},
+            )
+            response.raise_for_status()
+            user_ids[client] = (await client.get("/users/me")).json()["id"]
+
+        scenarios = [
+            (Scenario("POST /users/login", login, login_clients), args.login_requests),
+            (Scenario("GET /textbooks/", textbooks, clients), args.requests),
+            (
+                Scenario("GET /users/{user_id}/classes/", classes, clients),
+                args.requests,
+            ),
+            (Scenario("GET /contents/popup_word", popup_word, clients), args.requests),
+        ]
+        for scenario, requests in scenarios:
+            results[scenario.name] = await scenario.run(
+                args.concurrency, requests, args.seed
+            )
+            print(scenario.name, results[scenario.name], file=sys.stderr)
+
+    for client in login_clients + clients:
+        await client.aclose()
+    return results
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(baseline: dict, current: dict, tolerance: float) -> list[str]:
+    """
+    Prints metric changes against a previous run,
+    returns the regressions worse than tolerance percent
+    """
+    regressions = []
+    print(f"compared with {baseline['commit']} ({baseline['created_at']})")
+    for name, result in current["results"].items():
+        previous = baseline["results"].get(name)
+        if previous is None:
+            continue
+        print(name)
+        for metric in METRICS:
+            before, after = previous.get(metric), result.get(metric)
+            if not before or after is None:
+                continue
+            change = (after - before) / before * 100
+            worse = -change if metric in HIGHER_IS_BETTER else change
+            mark = "  REGRESSION" if worse > tolerance else ""
+            print(f"  {metric:<20} {before:>10} -> {after:>10} ({change:+.1f}%){mark}")
+            if mark:
+                regressions.append(f"{name} {metric}")
+    return regressions
+
+
+async def main(args: argparse.Namespace):
+    # a log line per request would be the bottleneck
+    logging.getLogger("app.profiling").setLevel(logging.WARNING)
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    report = {
+        "commit": git_commit(),
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "parameters": {
+            "users": args.users,
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "login_requests": args.login_requests,
+            "seed": args.seed,
+        },
+        "results": await run_benchmark(args),
+    }
+    with open(args.output, "w") as file:
+        json.dump(report, file, ensure_ascii=False, indent=2)
+    print(f"saved to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)
+        regressions = compare(baseline, report, args.tolerance)
+        if regressions:
+            raise SystemExit(f"Regressions: {', '.join(regressions)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Drive the hot endpoints in-process and report latency"
+    )
+    parser.add_argument("--users", type=int, default=50, help="logged in clients")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--requests", type=int, default=2_000, help="per endpoint")
+    parser.add_argument("--login-requests", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="benchmark.json")
+    parser.add_argument("--compare", help="previous report to diff against")
+    parser.add_argument(
+        "--tolerance", type=float, default=10.0, help="percent before a regression"
+    )
+    asyncio.run(main(parser.parse_args()))
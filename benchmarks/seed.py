@@ -0,0 +1,221 @@
+import argparse
+import asyncio
+import random
+from datetime import date, timedelta
+
+from sqlalchemy import insert, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.classes.models import (
+    Class,
+    ClassGrammar,
+    ClassTopic,
+    ClassUserLesson,
+    ClassWord,
+)
+from app.config import settings
+from app.contents.models import Grammar, Topic, Word
+from app.contents.services import kana_search_key
+from app.database import Base, new_session
+from app.textbooks.dao import CRUDUserTextbook
+from app.textbooks.models import Lesson, Textbook, UserLesson
+from app.users.auth import get_password_hash
+from app.users.models import User
+
+BENCHMARK_PASSWORD = "benchmark"
+BATCH_SIZE = 5_000
+
+HIRAGANA = [chr(code) for code in range(0x3041, 0x3094)]
+
+
+def user_email(number: int) -> str:
+    return f"bench-user-{number}@example.com"
+
+
+async def insert_rows(session: AsyncSession, model, rows: list[dict]) -> list[int]:
+    """Inserts in batches, returns the new ids in the order of rows"""
+    ids = []
+    for start in range(0, len(rows), BATCH_SIZE):
+        stmt = insert(model).returning(model.id, sort_by_parameter_order=True)
+        result = await session.execute(stmt, rows[start : start + BATCH_SIZE])
+        ids += result.scalars().all()
+    return ids
+
+
+async def seed(
+    session: AsyncSession,
+    users: int,
+    textbooks: int,
+    lessons_per_textbook: int,
+    words_per_lesson: int,
+    textbooks_per_user: int,
+    classes_per_user: int,
+    random_seed: int,
+) -> dict:
+    """
+    Replaces the contents of the database with a synthetic dataset.
+    The same arguments always produce the same rows
+    """
+    rng = random.Random(random_seed)
+    tables = ", ".join(f'"{table.name}"' for table in Base.metadata.sorted_tables)
+    await session.execute(text(f"truncate {tables} restart identity cascade"))
+
+    # bcrypt is slow on purpose, every user shares one hash
+    hashed_password = await get_password_hash(BENCHMARK_PASSWORD)
+    user_ids = await insert_rows(
+        session,
+        User,
+        [
+            {
+                "name": f"Студент {number}",
+                "slug": f"student-{number}",
+                "email": user_email(number),
+                "hashed_password": hashed_password,
+            }
+            for number in range(users)
+        ],
+    )
+
+    textbook_ids = await insert_rows(
+        session,
+        Textbook,
+        [
+            {"name": f"Учебник {number}", "slug": f"textbook-{number}"}
+            for number in range(textbooks)
+        ],
+    )
+    lesson_rows = [
+        {
+            "name": f"Урок {number}",
+            "slug": f"lesson-{number}",
+            "textbook_id": textbook_id,
+        }
+        for textbook_id in textbook_ids
+        for number in range(lessons_per_textbook)
+    ]
+    lesson_ids = await insert_rows(session, Lesson, lesson_rows)
+
+    word_rows = []
+    for lesson_id in lesson_ids:
+        for _ in range(words_per_lesson):
+            kana = "".join(rng.choices(HIRAGANA, k=rng.randint(2, 6)))
+            word_rows.append(
+                {
+                    "kana": kana,
+                    "search_key": kana_search_key(kana),
+                    "translation": f"слово {len(word_rows)}",
+                    "lesson_id": lesson_id,
+                }
+            )
+    word_ids = await insert_rows(session, Word, word_rows)
+    grammar_ids = await insert_rows(
+        session,
+        Grammar,
+        [
+            {"name_russian": f"Грамматика {number}", "lesson_id": lesson_id}
+            for number, lesson_id in enumerate(lesson_ids)
+        ],
+    )
+    topic_ids = await insert_rows(
+        session,
+        Topic,
+        [
+            {"name_russian": f"Тема {number}", "lesson_id": lesson_id}
+            for number, lesson_id in enumerate(lesson_ids)
+        ],
+    )
+
+    enrolled = {textbook_id: [] for textbook_id in textbook_ids}
+    for user_id in user_ids:
+        for textbook_id in rng.sample(textbook_ids, textbooks_per_user):
+            enrolled[textbook_id].append(user_id)
+    for textbook_id, enrolled_ids in enrolled.items():
+        if enrolled_ids:
+            await CRUDUserTextbook.enroll_users(session, enrolled_ids, textbook_id)
+
+    result = await session.execute(select(UserLesson.id, UserLesson.user_id))
+    userlessons = {}
+    for userlesson_id, user_id in result.all():
+        userlessons.setdefault(user_id, []).append(userlesson_id)
+
+    # one class a week going back from today
+    today = date.today()
+    class_rows = [
+        {
+            "class_date": today - timedelta(weeks=week),
+            "name": f"Занятие {week}",
+            "slug": f"class-{week}",
+            "user_id": user_id,
+        }
+        for user_id in user_ids
+        for week in range(classes_per_user)
+    ]
+    class_ids = await insert_rows(session, Class, class_rows)
+
+    links = {ClassWord: [], ClassGrammar: [], ClassTopic: [], ClassUserLesson: []}
+    for class_id, row in zip(class_ids, class_rows):
+        for word_id in rng.sample(word_ids, 5):
+            links[ClassWord].append({"class_id": class_id, "word_id": word_id})
+        links[ClassGrammar].append(
+            {"class_id": class_id, "grammar_id": rng.choice(grammar_ids)}
+        )
+        links[ClassTopic].append(
+            {"class_id": class_id, "topic_id": rng.choice(topic_ids)}
+        )
+        if userlessons.get(row["user_id"]):
+            links[ClassUserLesson].append(
+                {
+                    "class_id": class_id,
+                    "userlesson_id": rng.choice(userlessons[row["user_id"]]),
+                }
+            )
+    for model, rows in links.items():
+        await insert_rows(session, model, rows)
+
+    await session.execute(text("analyze"))
+    await session.commit()
+    return {
+        "users": len(user_ids),
+        "textbooks": len(textbook_ids),
+        "lessons": len(lesson_ids),
+        "words": len(word_ids),
+        "classes": len(class_ids),
+        "class_words": len(links[ClassWord]),
+    }
+
+
+async def main(args: argparse.Namespace):
+    if settings.MODE == "PROD":
+        raise SystemExit("Refusing to replace the data of a PROD database")
+    async with new_session() as session:
+        counts = await seed(
+            session,
+            users=args.users,
+            textbooks=args.textbooks,
+            lessons_per_textbook=args.lessons,
+            words_per_lesson=args.words,
+            textbooks_per_user=args.textbooks_per_user,
+            classes_per_user=args.classes,
+            random_seed=args.seed,
+        )
+    print(counts)
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--users", type=int, default=2_000)
+    parser.add_argument("--textbooks", type=int, default=10)
+    parser.add_argument("--lessons", type=int, default=30, help="per textbook")
+    parser.add_argument("--words", type=int, default=40, help="per lesson")
+    parser.add_argument("--textbooks-per-user", type=int, default=2)
+    parser.add_argument(
+        "--classes", type=int, default=150, help="weekly classes per user"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Replace the database contents with a synthetic dataset"
+    )
+    add_arguments(parser)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,91 @@
+import os
+
+from dotenv import dotenv_values
+
+# Settings are read on import. Values missing from the environment and
+# .env point at a local test database, the database tests only run
+# when MODE=TEST so they never touch a DEV database
+TEST_SETTINGS = {
+    "MODE": "TEST",
+    "LOG_LEVEL": "WARNING",
+    "DB_HOST": "localhost",
+    "DB_PORT": "5432",
+    "DB_USER": "postgres",
+    "DB_PASS": "postgres",
+    "DB_NAME": "lms_test",
+    "SECRET_KEY": "test",
+    "ALGORITHM": "HS256",
+}
+configured = dotenv_values(".env")
+for key, value in TEST_SETTINGS.items():
+    if key not in configured:
+        os.environ.setdefault(key, value)
+
+import asyncio  # noqa: E402
+from contextlib import contextmanager  # noqa: E402
+
+import pytest  # noqa: E402
+from sqlalchemy import event, text  # noqa: E402
+
+import app.main  # noqa: E402, F401  registers every model on Base.metadata
+from app.config import settings  # noqa: E402
+from app.database import Base, engine  # noqa: E402
+
+
+@pytest.fixture
+def run():
+    """
+    Runs a coroutine on its own event loop, pooled connections are closed
+    with it since they can't be shared between loops
+    """
+
+    def run(coroutine):
+        async def main():
+            try:
+                return await coroutine
+            finally:
+                await engine.dispose()
+
+        return asyncio.run(main())
+
+    return run
+
+
+@pytest.fixture
+def database(run):
+    """Empty schema created from the models"""
+    if settings.MODE != "TEST":
+        pytest.skip("database tests only run with MODE=TEST")
+
+    async def create_schema():
+        async with engine.begin() as conn:
+            await conn.execute(text("create extension if not exists pg_trgm"))
+            await conn.run_sync(Base.metadata.drop_all)
+            await conn.run_sync(Base.metadata.create_all)
+
+    try:
+        run(create_schema())
+    except OSError as e:
+        pytest.skip(f"database is not available: {e}")
+
+
+@pytest.fixture
+def count_queries():
+    """Collects the SQL statements sent to the database inside the block"""
+
+    @contextmanager
+    def count_queries():
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+        try:
+            yield statements
+        finally:
+            event.remove(
+                engine.sync_engine, "before_cursor_execute", before_cursor_execute
+            )
+
+    return count_queries
@@ -0,0 +1,74 @@
+from sqlalchemy import delete, insert
+
+from app.contents.autocomplete import WordPrefixIndex
+from app.contents.models import Word
+from app.database import new_session
+
+
+def word(word_id: int, kana: str, kanji: str | None = None) -> dict:
+    return {"id": word_id, "kana": kana, "kanji": kanji, "translation": None}
+
+
+def ids(words: list[dict]) -> list[int]:
+    return [word["id"] for word in words]
+
+
+def test_search_matches_kana_of_either_script_and_kanji_prefixes():
+    index = WordPrefixIndex()
+    index.apply(
+        [
+            word(1, "ねこ", "猫"),
+            word(2, "ねずみ", "鼠"),
+            word(3, "いぬ", "犬"),
+            word(4, "ネクタイ"),
+        ]
+    )
+
+    assert ids(index.search("ね", 10)) == [4, 1, 2]
+    assert ids(index.search("ネコ", 10)) == [1]
+    assert ids(index.search("猫", 10)) == [1]
+    assert index.search("さ", 10) == []
+
+
+def test_search_stops_at_the_limit():
+    index = WordPrefixIndex()
+    index.apply([word(number, "か" * number) for number in range(1, 6)])
+
+    assert ids(index.search("か", 3)) == [1, 2, 3]
+
+
+def test_apply_replaces_and_removes_words_in_one_batch():
+    index = WordPrefixIndex()
+    index.apply([word(1, "ねこ"), word(2, "いぬ")])
+
+    index.apply([word(1, "とり"), word(3, "ねずみ")], removed_ids=[2])
+
+    assert ids(index.search("ね", 10)) == [3]
+    assert ids(index.search("と", 10)) == [1]
+    assert index.search("い", 10) == []
+
+
+def test_sync_picks_up_words_written_by_other_workers(database, run):
+    index = WordPrefixIndex()
+
+    async def scenario():
+        async with new_session() as session:
+            session.add(Word(kana="ねこ"))
+            await session.commit()
+            await index.load(session)
+            # another worker, its commits never reach the hooks of this index
+            await session.execute(
+                insert(Word).values(kana="ねずみ", search_key="ねずみ")
+            )
+            await session.commit()
+            await index.sync(session)
+            added = index.search("ね", 10)
+            await session.execute(delete(Word).where(Word.kana == "ねこ"))
+            await session.commit()
+            await index.sync(session)
+            return added, index.search("ね", 10)
+
+    added, after_delete = run(scenario())
+
+    assert [word["kana"] for word in added] == ["ねこ", "ねずみ"]
+    assert [word["kana"] for word in after_delete] == ["ねずみ"]
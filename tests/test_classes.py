@@ -0,0 +1,136 @@
+from datetime import date
+
+from sqlalchemy import select
+
+from app.classes.dao import CRUDClass
+from app.classes.models import (
+    Class,
+    ClassGrammar,
+    ClassTopic,
+    ClassUserLesson,
+    ClassWord,
+)
+from app.classes.schemas import ClassDetailSchema
+from app.contents.models import EntityType, Grammar, Topic, UsefulLink, Word
+from app.database import new_session
+from app.textbooks.dao import CRUDUserTextbook
+from app.textbooks.models import Lesson, Textbook, UserLesson
+from app.users.models import User
+
+
+async def create_class() -> int:
+    async with new_session() as session:
+        user = User(name="Студент", email="student@example.com")
+        textbook = Textbook(name="Учебник")
+        session.add_all([user, textbook])
+        await session.flush()
+        lessons = [
+            Lesson(name=f"Урок {number}", textbook_id=textbook.id)
+            for number in range(3)
+        ]
+        session.add_all(lessons)
+        await session.flush()
+        words = [
+            Word(kana=kana, lesson_id=lessons[0].id)
+            for kana in ("ねこ", "いぬ", "とり", "さかな", "うま")
+        ]
+        grammars = [
+            Grammar(name_russian=f"Грамматика {number}", lesson_id=lessons[0].id)
+            for number in range(3)
+        ]
+        topics = [
+            Topic(name_russian=f"Тема {number}", lesson_id=lessons[0].id)
+            for number in range(3)
+        ]
+        class_ = Class(class_date=date(2026, 10, 1), name="Занятие", user_id=user.id)
+        session.add_all([*words, *grammars, *topics, class_])
+        await session.commit()
+        await CRUDUserTextbook.enroll_users(session, [user.id], textbook.id)
+
+        userlesson_ids = await session.scalars(
+            select(UserLesson.id).where(UserLesson.user_id == user.id)
+        )
+        session.add_all(
+            ClassUserLesson(class_id=class_.id, userlesson_id=userlesson_id)
+            for userlesson_id in userlesson_ids
+        )
+        session.add_all(
+            ClassWord(class_id=class_.id, word_id=word.id) for word in words
+        )
+        session.add_all(
+            ClassGrammar(class_id=class_.id, grammar_id=grammar.id)
+            for grammar in grammars
+        )
+        session.add_all(
+            ClassTopic(class_id=class_.id, topic_id=topic.id) for topic in topics
+        )
+        for number, grammar in enumerate(grammars):
+            session.add(
+                UsefulLink(
+                    url=f"https://example.com/grammar/{number}",
+                    description="Разбор",
+                    entity_type=EntityType.GRAMMAR,
+                    grammar_id=grammar.id,
+                )
+            )
+        for number, topic in enumerate(topics):
+            session.add(
+                UsefulLink(
+                    url=f"https://example.com/topic/{number}",
+                    description="Разбор",
+                    entity_type=EntityType.TOPIC,
+                    topic_id=topic.id,
+                )
+            )
+        await session.commit()
+        return class_.id
+
+
+def test_class_detail_has_a_fixed_query_budget(database, run, count_queries):
+    async def scenario():
+        class_id = await create_class()
+        async with new_session() as session:
+            with count_queries() as load_statements:
+                class_ = await CRUDClass.get_class_detail(session, class_id)
+            with count_queries() as serialize_statements:
+                detail = ClassDetailSchema.model_validate(class_, from_attributes=True)
+        return detail, load_statements, serialize_statements
+
+    detail, load_statements, serialize_statements = run(scenario())
+
+    assert len(detail.userlessons) == 3
+    assert all(userlesson.lesson.name for userlesson in detail.userlessons)
+    assert len(detail.words) == 5
+    assert [len(grammar.useful_links) for grammar in detail.grammar_topics] == [1, 1, 1]
+    assert [len(topic.useful_links) for topic in detail.other_topics] == [1, 1, 1]
+    assert len(load_statements) <= 7
+    # every relation is loaded up front, serialization must not lazy load
+    assert serialize_statements == []
+
+
+def test_class_summaries_are_paginated_by_date(database, run):
+    async def scenario():
+        async with new_session() as session:
+            user = User(name="Студент", email="student@example.com")
+            session.add(user)
+            await session.flush()
+            session.add_all(
+                Class(
+                    class_date=date(2026, 10, day),
+                    name=f"Занятие {day}",
+                    user_id=user.id,
+                )
+                for day in (15, 1, 8)
+            )
+            await session.commit()
+            first = await CRUDClass.get_class_summaries(session, user.id, None, 2)
+            second = await CRUDClass.get_class_summaries(
+                session, user.id, first["next_cursor"], 2
+            )
+        return first, second
+
+    first, second = run(scenario())
+
+    dates = [row.class_date.day for row in first["items"] + second["items"]]
+    assert dates == [1, 8, 15]
+    assert second["next_cursor"] is None
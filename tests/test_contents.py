@@ -0,0 +1,232 @@
+import json
+from datetime import date
+
+import httpx
+from sqlalchemy import func, select
+
+from app.classes.models import Class, ClassWord
+from app.contents.dao import CRUDWord
+from app.contents.exporter import export_user_words
+from app.contents.models import Word
+from app.database import new_session
+from app.main import app
+from app.users.models import User
+from app.users.schemas import UserIdentitySchema
+from app.users.services import get_current_user
+
+
+async def request(method: str, path: str, **kwargs) -> httpx.Response:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return await client.request(method, path, **kwargs)
+
+
+async def get(path: str, **kwargs) -> httpx.Response:
+    return await request("GET", path, **kwargs)
+
+
+def test_word_lookups_pick_one_of_kana_spellings(database, run):
+    async def scenario():
+        async with new_session() as session:
+            words = [
+                Word(kana="ねこ", translation="кошка"),
+                Word(kana="ネコ", translation="кошка"),
+            ]
+            session.add_all(words)
+            await session.commit()
+        popup = await get(
+            "/contents/popup_word", json={"kana": "ネコ", "translation": "кошка"}
+        )
+        word = await get(
+            "/contents/get_word", params={"kana": "ねこ", "translation": "кошка"}
+        )
+        return words, popup, word
+
+    words, popup, word = run(scenario())
+
+    assert popup.status_code == 200
+    assert popup.json()["id"] == words[0].id
+    assert word.status_code == 200
+    assert word.json()["id"] == words[0].id
+
+
+def test_lookup_resolves_kanji_terms_and_same_kana_pairs(database, run):
+    async def scenario():
+        async with new_session() as session:
+            session.add_all(
+                [
+                    Word(kana="かみ", translation="бумага"),
+                    Word(kana="かみ", translation="волосы"),
+                    Word(kana="れいぶん", kanji="例文", translation="пример"),
+                ]
+            )
+            await session.commit()
+        return await request(
+            "POST",
+            "/contents/lookup_words",
+            json={
+                "words": [
+                    {"kana": "かみ", "translation": "бумага"},
+                    {"kana": "かみ", "translation": "волосы"},
+                ],
+                "sentence": "これ は 例文 です。",
+            },
+        )
+
+    response = run(scenario())
+
+    assert response.status_code == 200
+    found = {
+        (result["term"], result["translation"]): [
+            word["translation"] for word in result["words"]
+        ]
+        for result in response.json()
+    }
+    assert found[("かみ", "бумага")] == ["бумага"]
+    assert found[("かみ", "волосы")] == ["волосы"]
+    assert found[("例文", None)] == ["пример"]
+
+
+def test_export_lists_each_word_of_the_user_once(database, run):
+    async def scenario():
+        async with new_session() as session:
+            student = User(name="Студент", email="student@example.com")
+            other = User(name="Другой", email="other@example.com")
+            words = [Word(kana=kana) for kana in ("ねこ", "いぬ", "とり")]
+            session.add_all([student, other, *words])
+            await session.flush()
+            classes = [
+                Class(class_date=date(2026, 10, day), name="Занятие", user_id=user.id)
+                for day, user in ((1, student), (8, student), (1, other))
+            ]
+            session.add_all(classes)
+            await session.flush()
+            session.add_all(
+                ClassWord(class_id=classes[number].id, word_id=words[index].id)
+                for number, index in ((0, 1), (0, 0), (1, 0), (2, 2))
+            )
+            await session.commit()
+        chunks = [chunk async for chunk in export_user_words(student.id, "ndjson")]
+        return words, chunks
+
+    words, chunks = run(scenario())
+
+    rows = [json.loads(line) for line in b"".join(chunks).decode().splitlines()]
+    assert [row["id"] for row in rows] == [words[0].id, words[1].id]
+
+
+def test_upsert_reports_inserted_and_existing_words(database, run):
+    rows = [
+        {"kana": "ねこ", "translation": "кошка"},
+        {"kana": "ねこ", "translation": None},
+        {"kana": "いぬ", "translation": "собака"},
+    ]
+
+    async def scenario():
+        async with new_session() as session:
+            first = await CRUDWord.upsert_bulk(session, rows)
+            second = await CRUDWord.upsert_bulk(
+                session, rows + [{"kana": "とり", "translation": None}]
+            )
+            count = await session.scalar(select(func.count(Word.id)))
+        return first, second, count
+
+    first, second, count = run(scenario())
+
+    assert len(first["inserted"]) == 3
+    assert first["existing"] == []
+    assert sorted(second["existing"]) == sorted(first["inserted"])
+    assert len(second["inserted"]) == 1
+    assert count == 4
+
+
+async def import_as_admin(content: str, **params) -> httpx.Response:
+    async with new_session() as session:
+        admin = User(name="Админ", email="admin@example.com", is_admin=True)
+        session.add(admin)
+        await session.commit()
+    identity = UserIdentitySchema(
+        id=admin.id, name=admin.name, email=admin.email, is_admin=True
+    )
+    app.dependency_overrides[get_current_user] = lambda: identity
+    try:
+        return await request(
+            "POST",
+            "/contents/import_words",
+            params=params,
+            files={"file": ("words.tsv", content.encode())},
+        )
+    finally:
+        app.dependency_overrides.clear()
+
+
+def test_import_reports_inserted_duplicate_and_invalid_rows(database, run):
+    content = (
+        "kana\ttranslation\n"
+        "ねこ\tкошка\n"
+        "いぬ\tсобака\n"
+        "ねこ\tкошка\n"
+        "cat\tкошка\n"
+        "とり\t\n"
+    )
+
+    async def scenario():
+        async with new_session() as session:
+            session.add(Word(kana="とり"))
+            await session.commit()
+        response = await import_as_admin(content)
+        async with new_session() as session:
+            words = (await session.scalars(select(Word.kana).order_by(Word.id))).all()
+        return response, words
+
+    response, words = run(scenario())
+
+    assert response.status_code == 200
+    report = response.json()
+    assert (report["rows"], report["valid"]) == (5, 4)
+    assert (report["inserted"], report["duplicates"]) == (2, 2)
+    assert report["errors_total"] == 1
+    assert report["errors"][0]["line"] == 5
+    assert sorted(words) == sorted(["とり", "ねこ", "いぬ"])
+
+
+def test_import_into_unknown_lesson_is_not_found(database, run):
+    response = run(import_as_admin("ねこ\tкошка\n", lesson_id=1))
+
+    assert response.status_code == 404
+
+
+def test_words_of_last_classes_carry_their_first_class_date(database, run):
+    async def scenario():
+        async with new_session() as session:
+            user = User(name="Студент", email="student@example.com")
+            words = [Word(kana=kana) for kana in ("ねこ", "いぬ", "とり")]
+            session.add_all([user, *words])
+            await session.flush()
+            classes = [
+                Class(class_date=date(2026, 10, day), name="Занятие", user_id=user.id)
+                for day in (1, 8, 15)
+            ]
+            session.add_all(classes)
+            await session.flush()
+            session.add_all(
+                ClassWord(class_id=classes[number].id, word_id=words[index].id)
+                for number, index in ((0, 2), (1, 0), (2, 0), (2, 1))
+            )
+            await session.commit()
+            last_two = await CRUDWord.get_words_of_last_classes(session, user.id, 2)
+            between = await CRUDWord.get_words_between(
+                session, user.id, date(2026, 10, 1), date(2026, 10, 8)
+            )
+        return last_two, between
+
+    last_two, between = run(scenario())
+
+    assert [(word["kana"], word["first_class_date"]) for word in last_two] == [
+        ("ねこ", date(2026, 10, 8)),
+        ("いぬ", date(2026, 10, 15)),
+    ]
+    assert [(word["kana"], word["first_class_date"]) for word in between] == [
+        ("とり", date(2026, 10, 1)),
+        ("ねこ", date(2026, 10, 8)),
+    ]
@@ -0,0 +1,40 @@
+from sqlalchemy import func, select
+
+from app.database import get_unit_of_work_session, new_session
+from app.textbooks.dao import CRUDTextbook
+from app.textbooks.models import Textbook
+
+
+async def count_textbooks() -> int:
+    async with new_session() as session:
+        return await session.scalar(select(func.count(Textbook.id)))
+
+
+def test_unit_of_work_commits_once_at_the_end(database, run):
+    async def scenario():
+        sessions = get_unit_of_work_session()
+        session = await anext(sessions)
+        await CRUDTextbook.add(session, name="Учебник 1")
+        await CRUDTextbook.add(session, name="Учебник 2")
+        before_end = await count_textbooks()
+        await anext(sessions, None)
+        return before_end, await count_textbooks()
+
+    before_end, after_end = run(scenario())
+
+    assert before_end == 0
+    assert after_end == 2
+
+
+def test_unit_of_work_rolls_back_every_write_on_error(database, run):
+    async def scenario():
+        sessions = get_unit_of_work_session()
+        session = await anext(sessions)
+        await CRUDTextbook.add(session, name="Учебник 1")
+        try:
+            await sessions.athrow(RuntimeError("handler failed"))
+        except RuntimeError:
+            pass
+        return await count_textbooks()
+
+    assert run(scenario()) == 0
@@ -0,0 +1,6 @@
+import app.main  # noqa: F401  registers every model on Base.metadata
+from app.database import Base, find_unindexed_foreign_keys
+
+
+def test_every_foreign_key_is_indexed():
+    assert find_unindexed_foreign_keys(Base.metadata) == []
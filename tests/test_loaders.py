@@ -0,0 +1,81 @@
+import asyncio
+
+import httpx
+
+from app.database import new_session
+from app.main import app
+from app.textbooks.dao import CRUDTextbook
+from app.textbooks.models import Lesson, Textbook
+from app.users.dao import CRUDUser
+from app.users.models import User
+
+
+async def create_users(count: int) -> list[int]:
+    async with new_session() as session:
+        users = [
+            User(name=f"Студент {number}", email=f"student{number}@example.com")
+            for number in range(count)
+        ]
+        session.add_all(users)
+        await session.commit()
+        return [user.id for user in users]
+
+
+def test_gathered_lookups_share_one_query_per_model(database, run, count_queries):
+    async def scenario():
+        user_ids = await create_users(3)
+        async with new_session() as session:
+            session.add(Textbook(name="Учебник"))
+            await session.commit()
+            session.expunge_all()
+            with count_queries() as first:
+                users, textbook, missing = await asyncio.gather(
+                    CRUDUser.get_many_by_ids(session, user_ids),
+                    CRUDTextbook.get_by_id(session, 1),
+                    CRUDUser.get_by_id(session, user_ids[-1] + 1),
+                )
+            with count_queries() as repeated:
+                again = await CRUDUser.get_by_id(session, user_ids[0])
+                still_missing = await CRUDUser.get_by_id(session, user_ids[-1] + 1)
+        return user_ids, users, textbook, missing, again, still_missing, first, repeated
+
+    user_ids, users, textbook, missing, again, still_missing, first, repeated = run(
+        scenario()
+    )
+
+    assert [user.id for user in users] == user_ids
+    assert textbook.name == "Учебник"
+    assert missing is None and still_missing is None
+    assert again is users[0]
+    assert len(first) == 2
+    assert sum(" IN (" in statement for statement in first) == 2
+    assert repeated == []
+
+
+def test_cohort_enrollment_resolves_users_in_one_query(database, run, count_queries):
+    async def scenario():
+        user_ids = await create_users(5)
+        async with new_session() as session:
+            textbook = Textbook(name="Учебник")
+            session.add(textbook)
+            await session.flush()
+            session.add(Lesson(name="Урок", textbook_id=textbook.id))
+            await session.commit()
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://test"
+        ) as client:
+            with count_queries() as statements:
+                response = await client.post(
+                    "/textbooks/add_textbook_for_users",
+                    json={"user_ids": user_ids, "textbook_id": textbook.id},
+                )
+        return response, statements
+
+    response, statements = run(scenario())
+
+    assert response.status_code == 200
+    assert response.json()["skipped_user_ids"] == []
+    user_lookups = [statement for statement in statements if 'FROM "user"' in statement]
+    assert len(user_lookups) == 1
+    assert " IN (" in user_lookups[0]
@@ -0,0 +1,194 @@
+import importlib.util
+import logging
+from collections import deque
+from pathlib import Path
+
+import httpx
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+from prometheus_client import REGISTRY, CollectorRegistry, Counter
+from sqlalchemy import inspect, select, text
+
+from app.config import settings
+from app.database import engine, new_session
+from app.main import app
+from app.monitoring.metrics import _export_total
+from app.monitoring.slow_queries import slow_query_log
+from app.users.models import User
+from app.users.schemas import UserIdentitySchema
+from app.users.services import get_current_user
+
+
+async def request(method: str, path: str, **kwargs) -> httpx.Response:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return await client.request(method, path, **kwargs)
+
+
+def server_timing(response: httpx.Response) -> dict[str, str]:
+    metrics = {}
+    for metric in response.headers["server-timing"].split(","):
+        name, _, params = metric.strip().partition(";")
+        metrics[name] = params.partition("=")[2]
+    return metrics
+
+
+def test_server_timing_reports_the_queries_of_the_request(database, run):
+    response = run(request("GET", "/textbooks/all"))
+
+    assert response.status_code == 200
+    timing = server_timing(response)
+    assert timing["queries"] == "1"
+    assert float(timing["db"]) > 0
+    assert float(timing["total"]) >= float(timing["db"])
+
+
+def test_requests_over_the_query_budget_are_logged(database, run, monkeypatch, caplog):
+    monkeypatch.setattr(settings, "QUERY_BUDGET", 0)
+
+    with caplog.at_level(logging.WARNING, logger="app.profiling"):
+        run(request("GET", "/textbooks/all"))
+
+    assert "GET /textbooks/all ran 1 queries, the budget is 0" in caplog.messages
+
+
+def requests_total(route: str, status: str) -> float:
+    value = REGISTRY.get_sample_value(
+        "http_requests_total",
+        {"method": "GET", "route": route, "status": status},
+    )
+    return value or 0.0
+
+
+def test_metrics_are_labelled_with_the_route_template(database, run):
+    before = requests_total("/users/{user_id}", "200")
+    unmatched_before = requests_total("unmatched", "404")
+
+    run(request("GET", "/users/12345"))
+    run(request("GET", "/no/such/path"))
+    response = run(request("GET", "/metrics"))
+
+    assert requests_total("/users/{user_id}", "200") == before + 1
+    assert requests_total("unmatched", "404") == unmatched_before + 1
+    assert 'route="/users/12345"' not in response.text
+    assert "db_pool_checkouts_total" in response.text
+
+
+def test_process_totals_are_exported_as_deltas():
+    registry = CollectorRegistry()
+    counter = Counter("test_checkouts", "Checkouts", registry=registry)
+
+    for total in (5, 8, 8, 3):
+        _export_total(counter, total)
+
+    # a total going back (e.g. reset pool stats) never decrements the counter
+    assert registry.get_sample_value("test_checkouts_total") == 8
+    _export_total(counter, 4)
+    assert registry.get_sample_value("test_checkouts_total") == 9
+
+
+def test_slow_queries_keep_parameter_types_only(database, run, monkeypatch, caplog):
+    monkeypatch.setattr(settings, "SLOW_QUERY_THRESHOLD_MS", 0)
+    monkeypatch.setattr(slow_query_log, "entries", deque(maxlen=10))
+    monkeypatch.setattr(slow_query_log, "explain", False)
+
+    async def scenario():
+        async with new_session() as session:
+            await session.execute(
+                select(User.id).where(User.email == "secret@example.com")
+            )
+
+    with caplog.at_level(logging.WARNING, logger="app.slow_queries"):
+        run(scenario())
+
+    entry = next(
+        entry for entry in slow_query_log.entries if 'FROM "user"' in entry["statement"]
+    )
+    assert entry["parameters"] == ["str"]
+    assert "secret@example.com" not in str(list(slow_query_log.entries))
+    assert "secret@example.com" not in caplog.text
+
+
+def as_user(is_admin: bool):
+    async def scenario(method: str, path: str, **kwargs):
+        async with new_session() as session:
+            user = User(
+                name="Пользователь", email="user@example.com", is_admin=is_admin
+            )
+            session.add(user)
+            await session.commit()
+        identity = UserIdentitySchema(
+            id=user.id, name=user.name, email=user.email, is_admin=is_admin
+        )
+        app.dependency_overrides[get_current_user] = lambda: identity
+        try:
+            return await request(method, path, **kwargs)
+        finally:
+            app.dependency_overrides.clear()
+
+    return scenario
+
+
+def test_slow_query_explain_switch_is_admin_only(database, run, monkeypatch):
+    monkeypatch.setattr(slow_query_log, "explain", False)
+
+    denied = run(
+        as_user(is_admin=False)(
+            "PUT", "/monitoring/slow_queries/explain", params={"enabled": True}
+        )
+    )
+    explain_after_denied = slow_query_log.explain
+
+    assert denied.status_code == 403
+    assert explain_after_denied is False
+
+
+def test_admin_turns_slow_query_explain_on(database, run, monkeypatch):
+    monkeypatch.setattr(slow_query_log, "explain", False)
+
+    allowed = run(
+        as_user(is_admin=True)(
+            "PUT", "/monitoring/slow_queries/explain", params={"enabled": True}
+        )
+    )
+
+    assert allowed.status_code == 200
+    assert slow_query_log.explain is True
+
+
+def load_migration(revision: str):
+    versions = Path(__file__).parent.parent / "app" / "migrations" / "versions"
+    path = next(versions.glob(f"*-{revision}_*.py"))
+    spec = importlib.util.spec_from_file_location(path.stem, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_is_admin_migration_defaults_existing_users_to_false(database, run):
+    migration = load_migration("3cefab97b37c")
+
+    def run_migration(connection, step):
+        with Operations.context(MigrationContext.configure(connection)):
+            step()
+        return [column["name"] for column in inspect(connection).get_columns("user")]
+
+    async def scenario():
+        async with engine.begin() as conn:
+            await conn.execute(text('alter table "user" drop column is_admin'))
+            await conn.execute(
+                text(
+                    'insert into "user" (name, email, hashed_password) '
+                    "values ('Старый', 'old@example.com', 'hash')"
+                )
+            )
+            upgraded = await conn.run_sync(run_migration, migration.upgrade)
+            is_admin = await conn.scalar(text('select is_admin from "user"'))
+            downgraded = await conn.run_sync(run_migration, migration.downgrade)
+        return upgraded, is_admin, downgraded
+
+    upgraded, is_admin, downgraded = run(scenario())
+
+    assert "is_admin" in upgraded
+    assert is_admin is False
+    assert "is_admin" not in downgraded
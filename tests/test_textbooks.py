@@ -0,0 +1,209 @@
+import httpx
+import pytest
+from sqlalchemy import select
+
+from app.database import new_session
+from app.exceptions import ObjectNotFoundException, UnknownUsersException
+from app.main import app
+from app.textbooks.dao import CRUDLesson, CRUDUserLesson, CRUDUserTextbook
+from app.textbooks.models import Lesson, Textbook, UserLesson, UserTextbook
+from app.users.models import User
+from app.users.schemas import UserIdentitySchema
+from app.users.services import get_current_user
+
+
+def test_progress_tree_is_a_single_query(database, run, count_queries):
+    async def scenario():
+        async with new_session() as session:
+            user = User(name="Студент", email="student@example.com")
+            textbooks = [Textbook(name=f"Учебник {number}") for number in range(3)]
+            session.add_all([user, *textbooks])
+            await session.flush()
+            session.add_all(
+                Lesson(name=f"Урок {number}", textbook_id=textbook.id)
+                for textbook in textbooks
+                for number in range(4)
+            )
+            await session.commit()
+            for textbook in textbooks:
+                await CRUDUserTextbook.enroll_users(session, [user.id], textbook.id)
+
+        identity = UserIdentitySchema(id=user.id, name=user.name, email=user.email)
+        app.dependency_overrides[get_current_user] = lambda: identity
+        transport = httpx.ASGITransport(app=app)
+        try:
+            async with httpx.AsyncClient(
+                transport=transport, base_url="http://test"
+            ) as client:
+                with count_queries() as statements:
+                    response = await client.get("/textbooks/")
+        finally:
+            app.dependency_overrides.clear()
+        return response, statements
+
+    response, statements = run(scenario())
+
+    assert response.status_code == 200
+    textbooks = response.json()
+    assert len(textbooks) == 3
+    assert all(len(textbook["lessons"]) == 4 for textbook in textbooks)
+    assert len(statements) == 1
+
+
+def test_all_textbooks_are_paginated(database, run):
+    async def scenario():
+        async with new_session() as session:
+            session.add_all(
+                Textbook(name=f"Учебник {number}", slug=f"textbook-{number}")
+                for number in range(3)
+            )
+            await session.commit()
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://test"
+        ) as client:
+            first = await client.get("/textbooks/all", params={"limit": 2})
+            second = await client.get(
+                "/textbooks/all",
+                params={"limit": 2, "cursor": first.json()["next_cursor"]},
+            )
+        return first, second
+
+    first, second = run(scenario())
+
+    assert first.status_code == 200
+    assert [textbook["slug"] for textbook in first.json()["items"]] == [
+        "textbook-0",
+        "textbook-1",
+    ]
+    assert second.status_code == 200
+    assert [textbook["name"] for textbook in second.json()["items"]] == ["Учебник 2"]
+    assert second.json()["next_cursor"] is None
+
+
+async def create_textbook(lessons: int, users: int) -> tuple[int, list[int]]:
+    async with new_session() as session:
+        textbook = Textbook(name="Учебник")
+        students = [
+            User(name=f"Студент {number}", email=f"student{number}@example.com")
+            for number in range(users)
+        ]
+        session.add_all([textbook, *students])
+        await session.flush()
+        session.add_all(
+            Lesson(name=f"Урок {number}", textbook_id=textbook.id)
+            for number in range(lessons)
+        )
+        await session.commit()
+        return textbook.id, [student.id for student in students]
+
+
+def test_cohort_enrollment_skips_enrolled_users(database, run):
+    async def scenario():
+        textbook_id, user_ids = await create_textbook(lessons=3, users=3)
+        async with new_session() as session:
+            first = await CRUDUserTextbook.enroll_users(
+                session, [user_ids[0], user_ids[1], user_ids[0]], textbook_id
+            )
+            second = await CRUDUserTextbook.enroll_users(
+                session, [user_ids[1], user_ids[2]], textbook_id
+            )
+            totals = (await session.scalars(select(UserTextbook.total_lessons))).all()
+            userlessons = (await session.scalars(select(UserLesson.id))).all()
+        return user_ids, first, second, totals, userlessons
+
+    user_ids, first, second, totals, userlessons = run(scenario())
+
+    assert (first["usertextbooks"], first["userlessons"]) == (2, 6)
+    assert first["skipped_user_ids"] == []
+    assert (second["usertextbooks"], second["userlessons"]) == (1, 3)
+    assert second["skipped_user_ids"] == [user_ids[1]]
+    assert totals == [3, 3, 3]
+    assert len(userlessons) == 9
+
+
+def test_enrollment_rejects_unknown_textbook_and_users(database, run):
+    async def enroll(user_ids, textbook_id):
+        async with new_session() as session:
+            await CRUDUserTextbook.enroll_users(session, user_ids, textbook_id)
+
+    textbook_id, user_ids = run(create_textbook(lessons=1, users=1))
+
+    with pytest.raises(ObjectNotFoundException):
+        run(enroll(user_ids, textbook_id + 1))
+    with pytest.raises(UnknownUsersException) as error:
+        run(enroll([user_ids[0], user_ids[0] + 1], textbook_id))
+    assert error.value.status_code == 422
+    assert str(user_ids[0] + 1) in error.value.detail
+
+
+async def progress(session) -> tuple[int, int, bool]:
+    usertextbook = await session.scalar(
+        select(UserTextbook).execution_options(populate_existing=True)
+    )
+    return (
+        usertextbook.completed_lessons,
+        usertextbook.total_lessons,
+        usertextbook.completed,
+    )
+
+
+def test_repeated_status_updates_move_the_counters_once(database, run):
+    async def scenario():
+        textbook_id, user_ids = await create_textbook(lessons=2, users=1)
+        states = []
+        async with new_session() as session:
+            await CRUDUserTextbook.enroll_users(session, user_ids, textbook_id)
+            userlesson_ids = (await session.scalars(select(UserLesson.id))).all()
+            for userlesson_id, completed in [
+                (userlesson_ids[0], True),
+                (userlesson_ids[0], True),
+                (userlesson_ids[1], True),
+                (userlesson_ids[1], False),
+                (userlesson_ids[1], False),
+            ]:
+                await CRUDUserLesson.update_status(session, userlesson_id, completed)
+                states.append(await progress(session))
+        return states
+
+    states = run(scenario())
+
+    assert states == [
+        (1, 2, False),
+        (1, 2, False),
+        (2, 2, True),
+        (1, 2, False),
+        (1, 2, False),
+    ]
+
+
+def test_lessons_added_or_removed_after_enrollment_update_progress(database, run):
+    async def scenario():
+        textbook_id, user_ids = await create_textbook(lessons=1, users=1)
+        states = []
+        async with new_session() as session:
+            await CRUDUserTextbook.enroll_users(session, user_ids, textbook_id)
+            userlesson_id = await session.scalar(select(UserLesson.id))
+            await CRUDUserLesson.update_status(session, userlesson_id, True)
+            states.append(await progress(session))
+
+            await CRUDLesson.upsert_bulk(
+                session, [{"name": "Урок 1", "slug": None, "textbook_id": textbook_id}]
+            )
+            states.append(await progress(session))
+
+            lesson = Lesson(name="Урок 2", textbook_id=textbook_id)
+            session.add(lesson)
+            await session.commit()
+            states.append(await progress(session))
+
+            await session.delete(lesson)
+            await session.commit()
+            states.append(await progress(session))
+            userlessons = (await session.scalars(select(UserLesson.id))).all()
+        return states, userlessons
+
+    states, userlessons = run(scenario())
+
+    assert states == [(1, 1, True), (1, 2, False), (1, 3, False), (1, 2, False)]
+    assert len(userlessons) == 2
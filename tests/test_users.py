@@ -0,0 +1,150 @@
+import asyncio
+import time
+from datetime import timedelta
+
+import httpx
+import pytest
+from jose import jwt
+from sqlalchemy import select
+
+from app.config import settings
+from app.database import new_session
+from app.exceptions import IncorrectTokenFormatException, TokenExpiredException
+from app.main import app
+from app.users.auth import create_access_token, get_password_hash, verify_password
+from app.users.dao import CRUDUser, identity_cache
+from app.users.models import User
+from app.users.schemas import UserIdentitySchema
+from app.users.services import decode_token, get_current_user, token_cache
+
+
+def test_revoked_admin_is_rejected_despite_cached_identity(database, run):
+    async def scenario():
+        async with new_session() as session:
+            user = User(name="Бывший админ", email="admin@example.com")
+            session.add(user)
+            await session.commit()
+
+        # the identity another worker cached before is_admin was revoked
+        identity = UserIdentitySchema(
+            id=user.id, name=user.name, email=user.email, is_admin=True
+        )
+        app.dependency_overrides[get_current_user] = lambda: identity
+        transport = httpx.ASGITransport(app=app)
+        try:
+            async with httpx.AsyncClient(
+                transport=transport, base_url="http://test"
+            ) as client:
+                return await client.post(
+                    "/contents/import_words",
+                    files={"file": ("words.tsv", "ねこ\tкошка\n")},
+                )
+        finally:
+            app.dependency_overrides.clear()
+
+    response = run(scenario())
+
+    assert response.status_code == 403
+
+
+def test_concurrent_hashing_keeps_the_event_loop_running(run):
+    async def scenario():
+        ticks = []
+        hashing = asyncio.gather(
+            *(get_password_hash(f"password {number}") for number in range(4))
+        )
+        while not hashing.done():
+            ticks.append(time.perf_counter())
+            await asyncio.sleep(0)
+        return ticks, await hashing
+
+    ticks, hashes = run(scenario())
+
+    assert len(hashes) == 4
+    # a backend that holds the GIL stalls the loop for a whole hash
+    longest_stall = max(later - earlier for earlier, later in zip(ticks, ticks[1:]))
+    assert longest_stall < 0.05
+    assert run(verify_password("password 0", hashes[0]))
+
+
+def test_token_without_exp_is_rejected():
+    token = jwt.encode({"sub": "1"}, settings.SECRET_KEY, settings.ALGORITHM)
+
+    with pytest.raises(IncorrectTokenFormatException) as error:
+        decode_token(token)
+    assert error.value.status_code == 401
+
+
+def test_cached_token_expires(monkeypatch):
+    token = create_access_token({"sub": "1"}, expires_delta=timedelta(minutes=1))
+    assert decode_token(token)["sub"] == "1"
+    assert token_cache.get(token) is not None
+
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 120)
+    with pytest.raises(TokenExpiredException):
+        decode_token(token)
+    assert token_cache.get(token) is None
+
+
+def test_user_changes_invalidate_the_identity_cache(database, run):
+    async def scenario():
+        async with new_session() as session:
+            users = [
+                User(name=f"Студент {number}", email=f"student{number}@example.com")
+                for number in range(3)
+            ]
+            session.add_all(users)
+            await session.commit()
+            for user in users:
+                await CRUDUser.get_identity(session, user.id)
+            cached = [identity_cache.get(user.id) is not None for user in users]
+
+            await CRUDUser.update(session, {"id": users[0].id}, name="Новое имя")
+            renamed = await CRUDUser.get_identity(session, users[0].id)
+            await CRUDUser.delete(session, id=users[1].id)
+            deleted = await CRUDUser.get_identity(session, users[1].id)
+            # the ORM path, used by sqladmin
+            users[2].is_admin = True
+            await session.commit()
+            promoted = await CRUDUser.get_identity(session, users[2].id)
+        return cached, renamed, deleted, promoted
+
+    cached, renamed, deleted, promoted = run(scenario())
+
+    assert cached == [True, True, True]
+    assert renamed.name == "Новое имя"
+    assert deleted is None
+    assert promoted.is_admin
+
+
+async def delete(path: str) -> httpx.Response:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return await client.delete(path)
+
+
+def test_delete_user_by_id_and_by_name(database, run):
+    async def scenario():
+        async with new_session() as session:
+            users = [
+                User(name="Тёзка", email="first@example.com"),
+                User(name="Тёзка", email="second@example.com"),
+                User(name="Один", email="single@example.com"),
+            ]
+            session.add_all(users)
+            await session.commit()
+        responses = [
+            await delete(f"/users/id/{users[0].id + 100}"),
+            await delete("/users/Тёзка"),
+            await delete("/users/Один"),
+            await delete(f"/users/id/{users[0].id}"),
+        ]
+        async with new_session() as session:
+            left = (await session.scalars(select(User.email))).all()
+        return responses, left
+
+    responses, left = run(scenario())
+
+    assert [response.status_code for response in responses] == [404, 409, 200, 200]
+    assert left == ["second@example.com"]